@@ -43,7 +43,32 @@ class RiskAnalysisAgent(BaseAgent):
         self.collaboration_confidence_threshold = 0.7  # 协作触发阈值
         self.collaboration_enabled = True
 
-    def process(self, extraction_output: ExtractionOutput, validation_result: ValidationResult, doc_intel_output=None, info_extract_agent=None) -> RiskAnalysisOutput:
+    def prepare(self, extraction_output: ExtractionOutput, doc_intel_output=None) -> Dict[str, Any]:
+        """
+        Runs the parts of the analysis that do not depend on the validation result,
+        so they can be computed while the RuleCheckAgent is still running.
+
+        Args:
+            extraction_output: The extracted claim data
+            doc_intel_output: Optional output of the DocIntelAgent
+
+        Returns:
+            A dict to pass back to process() as ``prepared``
+        """
+        doc_type = getattr(doc_intel_output, 'doc_type', 'unknown') if doc_intel_output else 'unknown'
+        document_metadata = getattr(doc_intel_output, 'metadata', {}) if doc_intel_output else {}
+        confidence_score = getattr(doc_intel_output, 'confidence_score', 1.0) if doc_intel_output else 1.0
+        
+        return {
+            'doc_intel_output': doc_intel_output,
+            'doc_type': doc_type,
+            'document_metadata': document_metadata,
+            'confidence_score': confidence_score,
+            'fraud_analysis': self._analyze_fraud_patterns(extraction_output.extracted_data),
+            'doc_type_analysis': self._analyze_document_type_risks(doc_type, document_metadata, confidence_score),
+        }
+
+    def process(self, extraction_output: ExtractionOutput, validation_result: ValidationResult, doc_intel_output=None, info_extract_agent=None, prepared: Optional[Dict[str, Any]] = None) -> RiskAnalysisOutput:
         """
         Calculates a risk score based on validation violations and extracted data.
         Enhanced with North American insurance standards.
@@ -51,46 +76,35 @@ class RiskAnalysisAgent(BaseAgent):
         Args:
             extraction_output: The extracted claim data
             validation_result: The result from the RuleCheckAgent
+            prepared: Optional result of prepare() for the same inputs; computed here if omitted
 
         Returns:
             A RiskAnalysisOutput object with the calculated score and analysis
         """
-        # Start with base risk assessment
-        risk_score = 0
-        risk_factors = []
-        fraud_indicators = []
-        
-        # Analyze validation violations
-        if not validation_result.is_valid:
-            risk_score += 10
-            risk_factors.extend(validation_result.violations)
-            
-            # Add weight for specific violations
-            for violation in validation_result.violations:
-                if "Missing required field" in violation:
-                    risk_score += 20
-                    fraud_indicators.append("Incomplete documentation")
-                elif "Claim amount" in violation:
-                    risk_score += 40  # High risk
-                    fraud_indicators.append("Claim amount irregularity")
-                elif "invalid format" in violation:
-                    risk_score += 15
+        if prepared is None or prepared['doc_intel_output'] is not doc_intel_output:
+            prepared = self.prepare(extraction_output, doc_intel_output)
+
+        # Start with base risk assessment from validation violations
+        violation_analysis = self.score_violations(validation_result)
+        risk_score = violation_analysis['score_adjustment']
+        risk_factors = violation_analysis['risk_factors']
+        fraud_indicators = violation_analysis['indicators']
 
         # Enhanced AI analysis with North American fraud patterns
         extracted_data = validation_result.extracted_data if hasattr(validation_result, 'extracted_data') else extraction_output.extracted_data
         
         # Get document type information for specialized risk assessment
-        doc_type = getattr(doc_intel_output, 'doc_type', 'unknown') if doc_intel_output else 'unknown'
-        document_metadata = getattr(doc_intel_output, 'metadata', {}) if doc_intel_output else {}
-        confidence_score = getattr(doc_intel_output, 'confidence_score', 1.0) if doc_intel_output else 1.0
+        doc_type = prepared['doc_type']
+        document_metadata = prepared['document_metadata']
+        confidence_score = prepared['confidence_score']
         
         # 北美保险欺诈检测模式
-        fraud_analysis = self._analyze_fraud_patterns(extracted_data)
+        fraud_analysis = prepared['fraud_analysis']
         risk_score += fraud_analysis['score_adjustment']
         fraud_indicators.extend(fraud_analysis['indicators'])
         
         # Document type specific risk adjustments
-        doc_type_analysis = self._analyze_document_type_risks(doc_type, document_metadata, confidence_score)
+        doc_type_analysis = prepared['doc_type_analysis']
         risk_score += doc_type_analysis['score_adjustment']
         fraud_indicators.extend(doc_type_analysis['indicators'])
         risk_factors.extend(doc_type_analysis['risk_factors'])
@@ -159,13 +173,7 @@ class RiskAnalysisAgent(BaseAgent):
             
             # Adjust risk score based on AI assessment
             risk_level = analysis_results.get('risk_level', 'Medium')
-            if risk_level.lower() == "critical":
-                risk_score += 40
-            elif risk_level.lower() == "high":
-                risk_score += 30
-            elif risk_level.lower() == "medium":
-                risk_score += 15
-            # Low adds nothing
+            risk_score += self.level_adjustment(risk_level)
             
             analysis_details = analysis_results.get('detailed_analysis', ai_response)
             siu_referral_needed = analysis_results.get('siu_referral', False)
@@ -200,6 +208,61 @@ class RiskAnalysisAgent(BaseAgent):
             processing_priority = "Standard"
             settlement_estimate = None
         
+        return self.build_output(
+            risk_score=risk_score,
+            risk_factors=risk_factors,
+            fraud_indicators=fraud_indicators,
+            analysis_details=analysis_details,
+            source_uri=extraction_output.source_uri,
+            siu_referral_needed=siu_referral_needed,
+            processing_priority=processing_priority,
+            settlement_estimate=settlement_estimate,
+        )
+
+    def level_adjustment(self, risk_level: str) -> int:
+        """Score added for the risk level reported by the model (Low adds nothing)."""
+        return {"critical": 40, "high": 30, "medium": 15}.get(risk_level.lower(), 0)
+
+    def score_violations(self, validation_result: ValidationResult) -> Dict[str, Any]:
+        """Score rule-check violations; returns the score adjustment, risk factors and fraud indicators."""
+        score_adjustment = 0
+        risk_factors = []
+        indicators = []
+        
+        if not validation_result.is_valid:
+            score_adjustment += 10
+            risk_factors.extend(validation_result.violations)
+            
+            # Add weight for specific violations
+            for violation in validation_result.violations:
+                if "Missing required field" in violation:
+                    score_adjustment += 20
+                    indicators.append("Incomplete documentation")
+                elif "Claim amount" in violation:
+                    score_adjustment += 40  # High risk
+                    indicators.append("Claim amount irregularity")
+                elif "invalid format" in violation:
+                    score_adjustment += 15
+        
+        return {
+            'score_adjustment': score_adjustment,
+            'risk_factors': risk_factors,
+            'indicators': indicators
+        }
+
+    def build_output(
+        self,
+        *,
+        risk_score: int,
+        risk_factors: List[str],
+        fraud_indicators: List[str],
+        analysis_details: str,
+        source_uri: str,
+        siu_referral_needed: bool,
+        processing_priority: str,
+        settlement_estimate: Optional[Dict[str, float]],
+    ) -> RiskAnalysisOutput:
+        """Apply the North American thresholds to a raw score and build the final output."""
         # Normalize score to be within 0-100
         final_score = min(risk_score, 100)
         
@@ -227,7 +290,7 @@ class RiskAnalysisAgent(BaseAgent):
             risk_level=final_risk_level,
             risk_factors=risk_factors,
             analysis_details=analysis_details,
-            source_uri=extraction_output.source_uri,
+            source_uri=source_uri,
             fraud_indicators=fraud_indicators,
             siu_referral=siu_referral,
             auto_approve_eligible=auto_approve_eligible,
@@ -57,7 +57,7 @@ def analyze_document_with_gemini(uploaded_file):
     import time
     
     # 检查文件大小
-    file_size = len(uploaded_file.getvalue()) / 1024 / 1024  # MB
+    file_size = uploaded_file.size / 1024 / 1024  # MB
     if file_size > 20:  # 超过20MB的文件可能会有问题
         st.warning(f"⚠️ 文件较大（{file_size:.1f}MB），可能需要更长时间处理")
     
@@ -175,7 +175,7 @@ def main():
             st.success(f"✅ 文件已选择: {uploaded_file.name}")
             
             # 显示文件信息
-            file_size = len(uploaded_file.getvalue()) / 1024 / 1024  # MB
+            file_size = uploaded_file.size / 1024 / 1024  # MB
             st.info(f"📊 文件大小: {file_size:.2f} MB")
             
             # 分析按钮
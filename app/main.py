@@ -2,10 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
+import bisect
+import functools
+import hashlib
+import logging
+import queue
 import sys
 import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional
 
 # Ensure root directory is importable before local packages
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -14,16 +23,216 @@ if str(ROOT_DIR) not in sys.path:
 
 import streamlit as st
 from dotenv import load_dotenv
-from pipeline import create_pipeline
-from utils.i18n import i18n
+from utils.i18n import get_i18n
 
-# Load environment variables from .env file
-load_dotenv()
+i18n = get_i18n()
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Module-level constants (built once at import instead of on every rerun)
+# ---------------------------------------------------------------------------
+
+_STEP_KEYS = ("doc_analysis", "info_extraction", "rule_check", "risk_analysis", "report_generation")
+
+_LANGUAGE_MAP = {"中文": "zh", "English": "en"}
+
+_MODEL_MAPPING = {
+    "gemini-1.5-flash (推荐/Recommended)": "gemini-1.5-flash",
+    "gemini-1.5-pro (高质量/High Quality)": "gemini-1.5-pro",
+    "gemini-1.0-pro (兼容性最佳/Best Compatibility)": "gemini-1.0-pro",
+    "gemini-2.5-flash (最新/Latest)": "gemini-2.5-flash"
+}
+
+_IMAGE_NOTE = {
+    'processing_note': 'OCR text extraction and image analysis',
+    'processing_note_zh': 'OCR文本提取和图像分析'
+}
+_DICOM_NOTE = {
+    'processing_note': 'Medical imaging metadata and visual analysis',
+    'processing_note_zh': '医疗影像元数据和视觉分析'
+}
+_DOCUMENT_NOTE = {
+    'processing_note': 'Document parsing and content extraction',
+    'processing_note_zh': '文档解析和内容提取'
+}
+
+# 文件类型信息，处理说明已预先合并到每个条目中
+# 条目以只读视图返回，调用方无法修改跨会话共享的常量
+_FILE_TYPES = {ext: MappingProxyType(info) for ext, info in {
+    'pdf': {'icon': '📄', 'type': 'PDF Document', 'type_zh': 'PDF文档', 'category': 'document', **_DOCUMENT_NOTE},
+    'jpg': {'icon': '🖼️', 'type': 'JPEG Image', 'type_zh': 'JPEG图像', 'category': 'image', **_IMAGE_NOTE},
+    'jpeg': {'icon': '🖼️', 'type': 'JPEG Image', 'type_zh': 'JPEG图像', 'category': 'image', **_IMAGE_NOTE},
+    'png': {'icon': '🖼️', 'type': 'PNG Image', 'type_zh': 'PNG图像', 'category': 'image', **_IMAGE_NOTE},
+    'tiff': {'icon': '🏥', 'type': 'Medical Imaging (TIFF)', 'type_zh': '医疗影像(TIFF)', 'category': 'medical_image', **_IMAGE_NOTE},
+    'tif': {'icon': '🏥', 'type': 'Medical Imaging (TIFF)', 'type_zh': '医疗影像(TIFF)', 'category': 'medical_image', **_IMAGE_NOTE},
+    'dcm': {'icon': '🩻', 'type': 'DICOM Medical Image', 'type_zh': 'DICOM医疗影像', 'category': 'dicom', **_DICOM_NOTE},
+    'doc': {'icon': '📝', 'type': 'Word Document', 'type_zh': 'Word文档', 'category': 'document', **_DOCUMENT_NOTE},
+    'docx': {'icon': '📝', 'type': 'Word Document', 'type_zh': 'Word文档', 'category': 'document', **_DOCUMENT_NOTE},
+    'bmp': {'icon': '🖼️', 'type': 'Bitmap Image', 'type_zh': '位图图像', 'category': 'image', **_IMAGE_NOTE}
+}.items()}
+
+_UNKNOWN_FILE_INFO = MappingProxyType({
+    'icon': '📎',
+    'type': 'Unknown File',
+    'type_zh': '未知文件',
+    'category': 'unknown'
+})
+
+_RISK_THRESHOLDS = (25, 50, 75)  # 评分达到阈值即进入下一等级
+_RISK_LEVEL_KEYS = ('metrics.low_risk', 'metrics.medium_risk', 'metrics.high_risk', 'metrics.critical_risk')
+
+# ---------------------------------------------------------------------------
+# Processing stages
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class _Stage:
+    """处理流水线中的一个阶段"""
+    key: str  # 与 _STEP_KEYS 对应，同时作为结果在上下文中的键
+    progress: int
+    status_key: str
+    error_label: str
+    error_hint: str
+    run: Callable[[Any, Dict[str, Any]], Any]
+    # 失败时构造默认结果；为 None 表示该阶段失败后终止处理
+    fallback: Optional[Callable[[Dict[str, Any], Exception], Any]] = None
+
+def _run_rule_check(pipeline, ctx):
+    """规则验证阶段（与风险分析预处理并发）；预处理结果暂存到上下文中供下一阶段使用"""
+    validation_result, ctx["risk_prepared"] = asyncio.run(
+        pipeline.validate_and_prepare(ctx["info_extraction"], ctx["doc_analysis"])
+    )
+    return validation_result
+
+@functools.lru_cache(maxsize=1)
+def _pipeline_stages():
+    """构建阶段表（首次处理时才导入智能体结果类型）"""
+    from agents.rule_check import ValidationResult
+    from agents.risk_analysis import RiskAnalysisOutput
+    from agents.report_gen import ReportOutput
+
+    def fallback_validation(ctx, error):
+        # 创建一个基础的验证结果作为fallback
+        extraction_output = ctx["info_extraction"]
+        return ValidationResult(
+            is_valid=True,
+            violations=[],
+            validated_data=extraction_output.extracted_data,
+            source_uri=extraction_output.source_uri
+        )
+
+    def fallback_risk_analysis(ctx, error):
+        # 创建一个基础的风险分析结果作为fallback
+        return RiskAnalysisOutput(
+            risk_score=50,
+            risk_level="Medium",
+            risk_factors=["AI服务异常，基础评估"],
+            analysis_details=f"Risk analysis failed: {str(error)}",
+            source_uri=ctx["info_extraction"].source_uri,
+            fraud_indicators=[],
+            siu_referral=False,
+            auto_approve_eligible=False,
+            processing_priority="Standard",
+            estimated_settlement_range=None
+        )
+
+    def fallback_report(ctx, error):
+        # 创建一个基础的报告作为fallback
+        doc_output = ctx["doc_analysis"]
+        return ReportOutput(
+            recommendation="Manual_Review",
+            confidence_score=0.5,
+            report_content=f"""
+# 基础审计报告
+
+## 文档分析
+- 文档类型: {getattr(doc_output, 'document_type', '未知')}
+- 处理状态: 部分处理完成
+
+## 风险评估
+- 风险评分: {ctx["risk_analysis"].risk_score}/100
+- 处理建议: 人工审核
+
+## 注意事项
+- AI服务部分异常，建议人工复核
+- 报告基于可用信息生成
+
+**建议**: 联系技术支持或重新上传文档
+            """,
+            source_uri=getattr(doc_output, 'source_uri', ctx["file_path"]),
+            processing_priority="Standard",
+            investigation_required=False,
+            next_actions=["人工审核", "技术支持", "重新提交"]
+        )
+
+    return (
+        _Stage(
+            "doc_analysis", 20, 'processing.doc_analysis',
+            "📄 文档分析失败", "请检查文档格式是否为标准PDF文件",
+            lambda p, ctx: p.doc_intel_agent.process(ctx["file_path"])
+        ),
+        _Stage(
+            "info_extraction", 40, 'processing.info_extraction',
+            "🔍 信息提取失败", "AI服务可能暂时繁忙，请稍后重试",
+            lambda p, ctx: p.info_extract_agent.process(ctx["doc_analysis"])
+        ),
+        _Stage(
+            "rule_check", 60, 'processing.rule_validation',
+            "📋 规则验证失败", "验证规则可能需要更新，继续使用基础验证",
+            _run_rule_check,
+            fallback_validation
+        ),
+        _Stage(
+            "risk_analysis", 80, 'processing.risk_analysis',
+            "⚠️ 风险分析失败", "AI风险评估服务异常，使用基础风险评估",
+            lambda p, ctx: p.risk_analysis_agent.process(
+                ctx["info_extraction"],
+                ctx["rule_check"],
+                doc_intel_output=ctx["doc_analysis"],  # Enable collaboration
+                info_extract_agent=p.info_extract_agent,
+                prepared=ctx.get("risk_prepared")
+            ),
+            fallback_risk_analysis
+        ),
+        _Stage(
+            "report_generation", 90, 'processing.report_generation',
+            "📊 报告生成失败", "使用基础报告模板",
+            lambda p, ctx: p.report_gen_agent.process(
+                ctx["risk_analysis"], ctx["info_extraction"].extracted_data, ctx["language"]
+            ),
+            fallback_report
+        ),
+    )
 
 # ---------------------------------------------------------------------------
 # Streamlit page config and main app logic
 # ---------------------------------------------------------------------------
 
+@st.cache_resource
+def _bootstrap():
+    """进程级一次性初始化：加载 .env 环境变量（后续重跑只是一次缓存命中）"""
+    load_dotenv()
+    return True
+
+@st.cache_resource
+def _get_gemini_client(model: str):
+    """按模型缓存Gemini客户端，重复测试时复用已建立的连接"""
+    from services.gemini_client import GeminiClient
+    return GeminiClient(model=model)
+
+@st.cache_resource
+def _cached_pipeline(model: str):
+    """按模型缓存处理管道，避免每次提交都重新创建智能体和存储服务"""
+    # 延迟导入：pipeline 会加载全部智能体及 Google SDK，仅在真正处理文件时才需要
+    from pipeline import create_pipeline
+    return create_pipeline(model=model)
+
+@st.cache_resource
+def _parse_executor():
+    """进程级解析线程池：在上传文件的同时预先解析PDF文本"""
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="auditai-parse")
+
 def setup_page():
     """配置页面基本设置"""
     st.set_page_config(
@@ -32,252 +241,546 @@ def setup_page():
         layout="wide"
     )
 
-def render_language_switcher():
-    """渲染语言切换器"""
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### 🌍 Language / 语言")
-    
-    current_lang = i18n.get_current_language()
-    
-    col1, col2 = st.sidebar.columns(2)
-    
-    with col1:
-        if st.button(
-            i18n.get_text("language.switch_to_chinese"), 
-            disabled=(current_lang == 'zh'),
-            use_container_width=True
-        ):
-            i18n.set_language('zh')
-            st.rerun()
-    
-    with col2:
-        if st.button(
-            i18n.get_text("language.switch_to_english"), 
-            disabled=(current_lang == 'en'),
-            use_container_width=True
-        ):
-            i18n.set_language('en')
-            st.rerun()
-
 def check_api_key():
-    """检查API密钥配置"""
+    """检查API密钥配置（需在侧边栏上下文中调用）"""
+    T = _ui_strings(i18n.get_current_language())
     api_key = os.getenv("GEMINI_API_KEY")
     
-    with st.sidebar:
-        st.markdown(f"### {i18n.get_text('api_config.title')}")
-        
-        if not api_key:
-            st.warning(i18n.get_text('api_config.warning'))
-            st.info(i18n.get_text('api_config.info'))
-            return False
-        else:
-            st.success(i18n.get_text('api_config.success'))
-            return True
+    st.markdown(f"### {T['api_config.title']}")
+    
+    if not api_key:
+        st.warning(T['api_config.warning'])
+        st.info(T['api_config.info'])
+        return False
+    else:
+        st.success(T['api_config.success'])
+        return True
 
 def check_storage_service():
-    """检查并显示存储服务配置"""
+    """检查并显示存储服务配置（需在侧边栏上下文中调用）"""
+    T = _ui_strings(i18n.get_current_language())
     gcs_bucket = os.getenv("GCS_BUCKET")
     
-    with st.sidebar:
-        st.markdown("### ☁️ Storage Configuration")
-        
-        if gcs_bucket:
-            st.success(f"✅ {i18n.get_text('storage.gcs_title')}")
-            st.info(i18n.get_text('storage.gcs_bucket', bucket=gcs_bucket))
-            st.markdown(i18n.get_text('storage.gcs_description'))
-            return "gcs"
-        else:
-            st.info(i18n.get_text('storage.local_title'))
-            st.markdown(i18n.get_text('storage.local_description'))
-            return "local"
+    st.markdown("### ☁️ Storage Configuration")
+    
+    if gcs_bucket:
+        st.success(f"✅ {T['storage.gcs_title']}")
+        st.info(i18n.get_text('storage.gcs_bucket', bucket=gcs_bucket))
+        st.markdown(T['storage.gcs_description'])
+        return "gcs"
+    else:
+        st.info(T['storage.local_title'])
+        st.markdown(T['storage.local_description'])
+        return "local"
+
+@st.fragment
+def _model_test_fragment(selected_model):
+    """模型测试按钮；作为片段运行，点击时只重新运行此片段而非整个页面"""
+    if st.button("🧪 测试模型 / Test Model", help="测试所选模型是否在当前地区可用"):
+        with st.spinner("测试模型连接..."):
+            try:
+                test_client = _get_gemini_client(selected_model)
+                test_result = test_client.generate_content(prompt="Hello")
+                st.success(f"✅ 模型 {selected_model} 可用！")
+                st.caption(f"响应长度: {len(test_result)} 字符")
+            except Exception as e:
+                if "User location is not supported" in str(e):
+                    st.error(f"❌ 地理位置限制: {selected_model} 在当前地区不可用")
+                    st.warning("建议选择其他模型或使用VPN")
+                else:
+                    st.error(f"❌ 模型测试失败: {str(e)}")
+                    st.info("请检查API密钥或网络连接")
 
 def render_processing_steps():
     """渲染处理步骤说明"""
-    st.markdown(i18n.get_text('processing_steps.title'))
-    st.markdown(i18n.get_text('processing_steps.step1'))
-    st.markdown(i18n.get_text('processing_steps.step2'))
-    st.markdown(i18n.get_text('processing_steps.step3'))
-    st.markdown(i18n.get_text('processing_steps.step4'))
-    st.markdown(i18n.get_text('processing_steps.step5'))
+    T = _ui_strings(i18n.get_current_language())
+    st.markdown(T['processing_steps.title'])
+    st.markdown(T['processing_steps.step1'])
+    st.markdown(T['processing_steps.step2'])
+    st.markdown(T['processing_steps.step3'])
+    st.markdown(T['processing_steps.step4'])
+    st.markdown(T['processing_steps.step5'])
 
 def get_risk_level_text(risk_score):
     """根据风险评分获取风险等级文本"""
-    if risk_score >= 75:
-        return i18n.get_text('metrics.critical_risk')
-    elif risk_score >= 50:
-        return i18n.get_text('metrics.high_risk')
-    elif risk_score >= 25:
-        return i18n.get_text('metrics.medium_risk')
-    else:
-        return i18n.get_text('metrics.low_risk')
+    T = _ui_strings(i18n.get_current_language())
+    return T[_RISK_LEVEL_KEYS[bisect.bisect_right(_RISK_THRESHOLDS, risk_score)]]
 
 def get_file_type_info(file):
     """获取文件类型信息和处理建议"""
-    file_extension = file.name.lower().split('.')[-1] if '.' in file.name else ''
-    
-    file_types = {
-        'pdf': {
-            'icon': '📄',
-            'type': 'PDF Document',
-            'type_zh': 'PDF文档',
-            'category': 'document',
-            'processing_note': 'Standard text extraction and analysis',
-            'processing_note_zh': '标准文本提取和分析'
-        },
-        'jpg': {'icon': '🖼️', 'type': 'JPEG Image', 'type_zh': 'JPEG图像', 'category': 'image'},
-        'jpeg': {'icon': '🖼️', 'type': 'JPEG Image', 'type_zh': 'JPEG图像', 'category': 'image'},
-        'png': {'icon': '🖼️', 'type': 'PNG Image', 'type_zh': 'PNG图像', 'category': 'image'},
-        'tiff': {'icon': '🏥', 'type': 'Medical Imaging (TIFF)', 'type_zh': '医疗影像(TIFF)', 'category': 'medical_image'},
-        'tif': {'icon': '🏥', 'type': 'Medical Imaging (TIFF)', 'type_zh': '医疗影像(TIFF)', 'category': 'medical_image'},
-        'dcm': {'icon': '🩻', 'type': 'DICOM Medical Image', 'type_zh': 'DICOM医疗影像', 'category': 'dicom'},
-        'doc': {'icon': '📝', 'type': 'Word Document', 'type_zh': 'Word文档', 'category': 'document'},
-        'docx': {'icon': '📝', 'type': 'Word Document', 'type_zh': 'Word文档', 'category': 'document'},
-        'bmp': {'icon': '🖼️', 'type': 'Bitmap Image', 'type_zh': '位图图像', 'category': 'image'}
+    file_extension = os.path.splitext(file.name)[1][1:].lower()
+    return _FILE_TYPES.get(file_extension, _UNKNOWN_FILE_INFO)
+
+# main.py 中使用的不带参数的界面文本键，每种语言只解析一次
+_UI_KEYS = (
+    'api_config.title', 'api_config.warning', 'api_config.info',
+    'api_config.success',
+    'storage.gcs_title', 'storage.gcs_description', 'storage.local_title',
+    'storage.local_description', 'storage.uploaded_to_gcs',
+    'storage.powered_by_gcp',
+    'processing_steps.title', 'processing_steps.step1', 'processing_steps.step2',
+    'processing_steps.step3', 'processing_steps.step4', 'processing_steps.step5',
+    'metrics.critical_risk', 'metrics.high_risk', 'metrics.medium_risk',
+    'metrics.low_risk', 'metrics.risk_score', 'metrics.processing_priority',
+    'metrics.needed', 'metrics.not_needed', 'metrics.siu_investigation',
+    'metrics.final_recommendation', 'metrics.confidence',
+    'steps.completed', 'steps.processing', 'steps.pending',
+    'page_title',
+    'page_description',
+    'file_upload.error_no_key', 'file_upload.label', 'file_upload.help_text',
+    'file_upload.button',
+    'processing.initializing', 'processing.uploading', 'processing.progress_title',
+    'processing.completed', 'processing.doc_analysis',
+    'processing.info_extraction', 'processing.rule_validation',
+    'processing.risk_analysis', 'processing.report_generation',
+    'tabs.final_report', 'tabs.fraud_analysis', 'tabs.extracted_info',
+    'tabs.detailed_analysis', 'tabs.technical_details',
+    'fraud_analysis.title', 'fraud_analysis.expedited_processing',
+    'fraud_analysis.enhanced_review', 'fraud_analysis.standard_processing',
+    'fraud_analysis.siu_required', 'fraud_analysis.siu_description',
+    'fraud_analysis.no_siu', 'fraud_analysis.auto_approve_eligible',
+    'fraud_analysis.auto_approve_description',
+    'fraud_analysis.manual_review_required',
+    'fraud_analysis.manual_review_description', 'fraud_analysis.fraud_indicators',
+    'fraud_analysis.no_fraud_detected', 'fraud_analysis.settlement_estimate',
+    'detailed_analysis.title', 'detailed_analysis.rule_validation',
+    'detailed_analysis.all_rules_passed', 'detailed_analysis.risk_factors',
+    'detailed_analysis.no_risk_factors', 'detailed_analysis.next_actions',
+    'technical_details.title', 'technical_details.document_type',
+    'technical_details.content_length', 'technical_details.characters',
+    'technical_details.validation_status', 'technical_details.risk_score',
+    'technical_details.processing_model', 'technical_details.file_uri',
+    'footer',
+)
+
+@functools.lru_cache(maxsize=4)
+def _ui_strings(lang: str):
+    """按语言一次性解析全部静态界面文本，返回只读映射"""
+    return MappingProxyType(dict(zip(_UI_KEYS, i18n.get_texts(*_UI_KEYS, lang=lang))))
+
+@functools.lru_cache(maxsize=4)
+def _step_labels(lang: str):
+    """按语言缓存步骤名称，顺序与 _STEP_KEYS 一致"""
+    return i18n.get_texts(*(f'steps.{key}' for key in _STEP_KEYS), lang=lang)
+
+def render_progress_tracker(steps_status, slot=None):
+    """把全部步骤拼成一行 HTML，一次 markdown 调用输出（传入占位符时覆盖其内容）"""
+    T = _ui_strings(i18n.get_current_language())
+    step_names = _step_labels(i18n.get_current_language())
+    parts = []
+    for step_key, step_name in zip(_STEP_KEYS, step_names):
+        status = steps_status[step_key]
+        if status == "completed":
+            icon = T['steps.completed']
+        elif status == "processing":
+            icon = T['steps.processing']
+        else:
+            icon = T['steps.pending']
+        parts.append(f"<div class='step {status}' style='flex:1'>{icon} <b>{step_name}</b></div>")
+    html = "<div class='progress-row' style='display:flex;gap:1rem'>" + "".join(parts) + "</div>"
+    (slot or st).markdown(html, unsafe_allow_html=True)
+
+# ---------------------------------------------------------------------------
+# Background processing job
+# ---------------------------------------------------------------------------
+
+class _SkipCache(Exception):
+    """携带不应写入缓存的阶段结果（如文档分析返回的错误输出）"""
+    def __init__(self, result):
+        super().__init__()
+        self.result = result
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_stage_result(stage_key, digest, file_path, model, language, fallbacks, _run, _pipeline, _ctx):
+    """按文件内容摘要和存储位置缓存单个阶段的结果；同一文件再次分析时直接返回
+    （结果中的 source_uri 指向存储位置，切换本地/GCS 存储后不能复用旧结果）"""
+    result = _run(_pipeline, _ctx)
+    metadata = getattr(result, 'metadata', None)
+    if isinstance(metadata, dict) and 'error' in metadata:
+        raise _SkipCache(result)
+    return result
+
+def _run_stage(stage, pipeline, ctx):
+    """执行单个阶段；缓存键包含上游已回退的阶段，上游结果变化时不会命中旧结果"""
+    digest = ctx.get("digest")
+    if digest is None:
+        return stage.run(pipeline, ctx)
+    try:
+        return _cached_stage_result(
+            stage.key, digest, ctx["file_path"], ctx["model"], ctx["language"], tuple(ctx["fallbacks"]),
+            stage.run, pipeline, ctx
+        )
+    except _SkipCache as skip:
+        return skip.result
+
+def _run_pipeline_job(pipeline, ctx, events):
+    """在后台线程中依次执行各阶段，通过事件队列向页面报告状态（不直接渲染界面）"""
+    try:
+        for stage in _pipeline_stages():
+            events.put(("step", stage.key, "processing"))
+            events.put(("progress", stage.progress, stage.status_key))
+            
+            try:
+                ctx[stage.key] = _run_stage(stage, pipeline, ctx)
+                events.put(("step", stage.key, "completed"))
+            except Exception as e:
+                events.put(("message", "error", f"{stage.error_label}: {str(e)}"))
+                events.put(("message", "warning", stage.error_hint))
+                # 可回退的阶段失败时使用默认结果继续，否则终止处理
+                if stage.fallback is None:
+                    events.put(("step", stage.key, "failed"))
+                    events.put(("state", "failed"))
+                    return
+                ctx[stage.key] = stage.fallback(ctx, e)
+                ctx["fallbacks"].append(stage.key)
+                events.put(("step", stage.key, "completed_with_warnings"))
+        
+        events.put(("state", "done"))
+    except Exception as e:
+        events.put(("message", "fatal", str(e)))
+        events.put(("state", "failed"))
+
+def _start_pipeline_job(pipeline, file_path, file_sig, selected_model, digest=None):
+    """创建任务状态并启动后台处理线程"""
+    from streamlit.runtime.scriptrunner import add_script_run_ctx
+    
+    ctx = {
+        "file_path": file_path,
+        "language": i18n.get_current_language(),
+        "model": selected_model,
+        "digest": digest,
+        "fallbacks": [],
+    }
+    job = {
+        "file_sig": file_sig,
+        "model": selected_model,
+        "state": "running",
+        "steps": dict.fromkeys(_STEP_KEYS, "pending"),
+        "progress": (0, None),
+        "messages": [],
+        "events": queue.Queue(),
+        # 后台线程只写入 results，页面在收到 "done" 事件后才读取
+        "results": ctx,
     }
+    worker = threading.Thread(
+        target=_run_pipeline_job,
+        args=(pipeline, ctx, job["events"]),
+        name="auditai-pipeline",
+        daemon=True,
+    )
+    add_script_run_ctx(worker)
+    st.session_state['_pipeline_job'] = job
+    worker.start()
+    return job
+
+def _drain_job_events(job):
+    """把队列中积压的事件合并到任务状态中"""
+    events = job["events"]
+    while True:
+        try:
+            event = events.get_nowait()
+        except queue.Empty:
+            return
+        
+        kind = event[0]
+        if kind == "step":
+            job["steps"][event[1]] = event[2]
+        elif kind == "progress":
+            job["progress"] = (event[1], event[2])
+        elif kind == "message":
+            job["messages"].append((event[1], event[2]))
+        elif kind == "state":
+            job["state"] = event[1]
+            if job["state"] == "done":
+                # 结果单独保存，结果片段重跑时直接读取
+                st.session_state.pop('_show_all_extracted', None)
+                st.session_state['last_results'] = {
+                    "file_sig": job["file_sig"],
+                    "model": job["model"],
+                    "outputs": job["results"],
+                }
+
+def _render_job_progress(job, T):
+    """渲染进度条、步骤追踪器以及各阶段的错误/警告信息"""
+    if job["state"] == "done":
+        st.progress(100, text=T['processing.completed'])
+    else:
+        value, status_key = job["progress"]
+        st.progress(value, text=T[status_key] if status_key else None)
     
-    current_lang = i18n.get_current_language()
-    file_info = file_types.get(file_extension, {
-        'icon': '📎',
-        'type': 'Unknown File',
-        'type_zh': '未知文件',
-        'category': 'unknown'
-    })
-    
-    # 为不同类型的文件添加处理说明
-    if file_info['category'] == 'image' or file_info['category'] == 'medical_image':
-        file_info['processing_note'] = 'OCR text extraction and image analysis'
-        file_info['processing_note_zh'] = 'OCR文本提取和图像分析'
-    elif file_info['category'] == 'dicom':
-        file_info['processing_note'] = 'Medical imaging metadata and visual analysis'
-        file_info['processing_note_zh'] = '医疗影像元数据和视觉分析'
-    elif file_info['category'] == 'document':
-        file_info['processing_note'] = 'Document parsing and content extraction'
-        file_info['processing_note_zh'] = '文档解析和内容提取'
-    
-    return file_info
-
-def render_progress_tracker(steps_status):
-    """渲染进度追踪器"""
-    st.markdown(f"### {i18n.get_text('processing.progress_title')}")
-    
-    steps = [
-        ("doc_analysis", i18n.get_text('steps.doc_analysis')),
-        ("info_extraction", i18n.get_text('steps.info_extraction')),
-        ("rule_check", i18n.get_text('steps.rule_check')),
-        ("risk_analysis", i18n.get_text('steps.risk_analysis')),
-        ("report_generation", i18n.get_text('steps.report_generation'))
-    ]
-    
-    cols = st.columns(5)
-    for i, (step_key, step_name) in enumerate(steps):
-        with cols[i]:
-            status = steps_status.get(step_key, "pending")
-            if status == "completed":
-                st.markdown(f"{i18n.get_text('steps.completed')} **{step_name}**")
-            elif status == "processing":
-                st.markdown(f"{i18n.get_text('steps.processing')} **{step_name}**")
-            else:
-                st.markdown(f"{i18n.get_text('steps.pending')} **{step_name}**")
+    st.markdown(f"### {T['processing.progress_title']}")
+    render_progress_tracker(job["steps"])
+    
+    for kind, text in job["messages"]:
+        if kind == "warning":
+            st.warning(text)
+        elif kind == "fatal":
+            st.error(i18n.get_text('errors.processing_error', error=text))
+        else:
+            st.error(text)
+
+@st.fragment(run_every=0.5)
+def _job_progress_fragment():
+    """任务运行期间定时轮询进度；任务结束后触发整页重跑以显示结果"""
+    job = st.session_state.get('_pipeline_job')
+    if job is None:
+        return
+    
+    _drain_job_events(job)
+    if job["state"] != "running":
+        st.rerun()
+    _render_job_progress(job, _ui_strings(i18n.get_current_language()))
+
+_JSON_PREVIEW_KEYS = 50
+
+def render_extracted_data(extracted_data):
+    """显示提取的数据；字段较多时先在折叠面板中预览前若干项，按需加载全部"""
+    if len(extracted_data) <= _JSON_PREVIEW_KEYS:
+        st.json(extracted_data)
+        return
+    
+    if st.session_state.get('_show_all_extracted'):
+        with st.expander(f"{len(extracted_data)} fields", expanded=True):
+            st.json(extracted_data)
+        return
+    
+    with st.expander(f"{_JSON_PREVIEW_KEYS} / {len(extracted_data)} fields"):
+        preview = {k: extracted_data[k] for k in list(extracted_data)[:_JSON_PREVIEW_KEYS]}
+        st.json(preview, expanded=False)
+        if st.button("显示全部 / Show all", key="_show_all_extracted_btn"):
+            st.session_state['_show_all_extracted'] = True
+            st.rerun(scope="fragment")
+
+@st.fragment
+def _render_results():
+    """渲染处理完成后的汇总指标和详细结果标签页；作为片段运行，内部交互只重跑此部分"""
+    last_results = st.session_state.get('last_results')
+    if last_results is None:
+        return
+    
+    T = _ui_strings(i18n.get_current_language())
+    ctx = last_results["outputs"]
+    selected_model = last_results["model"]
+    doc_output = ctx["doc_analysis"]
+    extraction_output = ctx["info_extraction"]
+    validation_result = ctx["rule_check"]
+    risk_analysis_output = ctx["risk_analysis"]
+    final_report = ctx["report_generation"]
+    file_path = ctx["file_path"]
+    
+    # 显示结果
+    st.markdown("---")
+    st.markdown("## 🎯 **Analysis Results / 分析结果**")
+    
+    # Enhanced summary metrics with multi-language support
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        risk_level = get_risk_level_text(risk_analysis_output.risk_score)
+        st.metric(
+            label=T['metrics.risk_score'],
+            value=f"{risk_analysis_output.risk_score}/100",
+            delta=risk_level
+        )
+    
+    with col2:
+        priority_text = i18n.get_priority_text(risk_analysis_output.processing_priority)
+        st.metric(
+            label=T['metrics.processing_priority'],
+            value=priority_text
+        )
+    
+    with col3:
+        siu_text = T['metrics.needed'] if risk_analysis_output.siu_referral else T['metrics.not_needed']
+        st.metric(
+            label=T['metrics.siu_investigation'],
+            value=siu_text
+        )
+    
+    with col4:
+        recommendation_text = i18n.get_recommendation_text(final_report.recommendation)
+        st.metric(
+            label=T['metrics.final_recommendation'],
+            value=recommendation_text,
+            delta=f"{T['metrics.confidence']}: {final_report.confidence_score:.0%}"
+        )
+    
+    # Enhanced detailed results with North American standards
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        T['tabs.final_report'],
+        T['tabs.fraud_analysis'], 
+        T['tabs.extracted_info'],
+        T['tabs.detailed_analysis'],
+        T['tabs.technical_details']
+    ])
+    
+    with tab1:
+        st.markdown(f"### {T['tabs.final_report']}")
+        st.markdown(final_report.report_content)
+    
+    with tab2:
+        st.markdown(f"### {T['fraud_analysis.title']}")
+        
+        # Processing Priority Indicators
+        if risk_analysis_output.processing_priority == "Expedited":
+            st.success(T['fraud_analysis.expedited_processing'])
+        elif risk_analysis_output.processing_priority == "Enhanced_Review":
+            st.error(T['fraud_analysis.enhanced_review'])
+        else:
+            st.info(T['fraud_analysis.standard_processing'])
+        
+        # SIU Investigation
+        if risk_analysis_output.siu_referral:
+            st.error(f"**{T['fraud_analysis.siu_required']}**")
+            st.markdown(T['fraud_analysis.siu_description'])
+        else:
+            st.success(T['fraud_analysis.no_siu'])
+        
+        # Auto-approval eligibility
+        if risk_analysis_output.auto_approve_eligible:
+            st.success(f"**{T['fraud_analysis.auto_approve_eligible']}**")
+            st.markdown(T['fraud_analysis.auto_approve_description'])
+        else:
+            st.warning(f"**{T['fraud_analysis.manual_review_required']}**")
+            st.markdown(T['fraud_analysis.manual_review_description'])
+        
+        # Fraud indicators
+        st.markdown(T['fraud_analysis.fraud_indicators'])
+        if risk_analysis_output.fraud_indicators:
+            for indicator in risk_analysis_output.fraud_indicators:
+                st.warning(f"🚨 {indicator}")
+        else:
+            st.success(T['fraud_analysis.no_fraud_detected'])
+        
+        # Settlement estimate
+        settlement_range = risk_analysis_output.estimated_settlement_range
+        if settlement_range:
+            st.markdown(T['fraud_analysis.settlement_estimate'])
+            st.info(f"💰 ${settlement_range['low']:,.0f} - ${settlement_range['high']:,.0f}")
+    
+    with tab3:
+        st.markdown(f"### {T['tabs.extracted_info']}")
+        render_extracted_data(extraction_output.extracted_data)
+    
+    with tab4:
+        st.markdown(f"### {T['detailed_analysis.title']}")
+        
+        st.markdown(T['detailed_analysis.rule_validation'])
+        if validation_result.violations:
+            for violation in validation_result.violations:
+                st.error(f"❌ {violation}")
+        else:
+            st.success(T['detailed_analysis.all_rules_passed'])
+        
+        st.markdown(T['detailed_analysis.risk_factors'])
+        if risk_analysis_output.risk_factors:
+            for factor in risk_analysis_output.risk_factors:
+                st.warning(f"⚠️ {factor}")
+        else:
+            st.success(T['detailed_analysis.no_risk_factors'])
+        
+        # Next actions
+        if final_report.next_actions:
+            st.markdown(T['detailed_analysis.next_actions'])
+            for action in final_report.next_actions:
+                st.info(f"📋 {action}")
+    
+    with tab5:
+        st.markdown(f"### {T['technical_details.title']}")
+        
+        tech_data = {
+            T['technical_details.document_type']: doc_output.document_type,
+            T['technical_details.content_length']: f"{len(doc_output.extracted_text)} {T['technical_details.characters']}",
+            T['technical_details.validation_status']: "✅" if not validation_result.violations else "❌",
+            T['technical_details.risk_score']: f"{risk_analysis_output.risk_score}/100",
+            T['technical_details.processing_model']: selected_model,
+            T['technical_details.file_uri']: file_path
+        }
+        
+        st.text("\n".join(f"{key}: {value}" for key, value in tech_data.items()))
 
 def main():
     """主应用程序"""
     setup_page()
     
+    _bootstrap()
+    
     # 主标题
     st.title("🔍 AuditAI - 智能保险理赔审核系统")
     st.markdown("---")
 
-    # 侧边栏配置
-    st.sidebar.header("⚙️ 系统配置")
+    # 侧边栏配置：所有侧边栏内容在同一个上下文中连续渲染
+    with st.sidebar:
+        st.header("⚙️ 系统配置")
 
-    # 语言选择
-    language_display = st.sidebar.selectbox(
-        "🌐 语言 / Language",
-        ["中文", "English"],
-        key="language_display"
-    )
-    
-    # 映射显示语言到代码
-    language_map = {"中文": "zh", "English": "en"}
-    current_language_code = language_map[language_display]
-    
-    # 更新i18n语言设置
-    if i18n.get_current_language() != current_language_code:
-        i18n.set_language(current_language_code)
-
-    # 模型选择
-    st.sidebar.subheader("🤖 AI模型配置")
-    model_choice = st.sidebar.selectbox(
-        "选择Gemini模型 / Choose Gemini Model",
-        [
-            "gemini-1.5-flash (推荐/Recommended)",
-            "gemini-1.5-pro (高质量/High Quality)", 
-            "gemini-1.0-pro (兼容性最佳/Best Compatibility)",
-            "gemini-2.5-flash (最新/Latest)"
-        ],
-        key="model_choice",
-        help="不同模型在不同地区的可用性可能不同 / Model availability may vary by region"
-    )
+        # 语言选择
+        language_display = st.selectbox(
+            "🌐 语言 / Language",
+            list(_LANGUAGE_MAP),
+            key="language_display"
+        )
+        
+        # 映射显示语言到代码
+        current_language_code = _LANGUAGE_MAP[language_display]
+        
+        # 更新i18n语言设置
+        if i18n.get_current_language() != current_language_code:
+            i18n.set_language(current_language_code)
 
-    # 提取模型名称
-    model_mapping = {
-        "gemini-1.5-flash (推荐/Recommended)": "gemini-1.5-flash",
-        "gemini-1.5-pro (高质量/High Quality)": "gemini-1.5-pro", 
-        "gemini-1.0-pro (兼容性最佳/Best Compatibility)": "gemini-1.0-pro",
-        "gemini-2.5-flash (最新/Latest)": "gemini-2.5-flash"
-    }
-    selected_model = model_mapping[model_choice]
+        # 模型选择
+        st.subheader("🤖 AI模型配置")
+        model_choice = st.selectbox(
+            "选择Gemini模型 / Choose Gemini Model",
+            list(_MODEL_MAPPING),
+            key="model_choice",
+            help="不同模型在不同地区的可用性可能不同 / Model availability may vary by region"
+        )
 
-    # 显示当前模型状态和测试功能
-    with st.sidebar:
+        # 提取模型名称
+        selected_model = _MODEL_MAPPING[model_choice]
+
+        # 显示当前模型状态和测试功能
         st.info(f"当前模型: {selected_model}")
         
         # 模型测试功能
-        if st.button("🧪 测试模型 / Test Model", help="测试所选模型是否在当前地区可用"):
-            with st.spinner("测试模型连接..."):
-                try:
-                    from services.gemini_client import GeminiClient
-                    test_client = GeminiClient(model=selected_model)
-                    test_result = test_client.generate_content(prompt="Hello")
-                    st.success(f"✅ 模型 {selected_model} 可用！")
-                    st.caption(f"响应长度: {len(test_result)} 字符")
-                except Exception as e:
-                    if "User location is not supported" in str(e):
-                        st.error(f"❌ 地理位置限制: {selected_model} 在当前地区不可用")
-                        st.warning("建议选择其他模型或使用VPN")
-                    else:
-                        st.error(f"❌ 模型测试失败: {str(e)}")
-                        st.info("请检查API密钥或网络连接")
+        _model_test_fragment(selected_model)
 
-    # 渲染语言切换器
-    render_language_switcher()
+        # 检查API密钥和存储服务配置
+        api_key_configured = check_api_key()
+        storage_type = check_storage_service() if api_key_configured else None
+    
+    # 语言确定后一次性取出本次重跑使用的静态文本
+    T = _ui_strings(i18n.get_current_language())
     
     # 标题和描述
-    st.title(i18n.get_text('page_title'))
-    st.markdown(i18n.get_text('page_description'))
+    st.title(T['page_title'])
+    st.markdown(T['page_description'])
     
-    # 检查API密钥
-    if not check_api_key():
-        st.error(i18n.get_text('file_upload.error_no_key'))
+    if not api_key_configured:
+        st.error(T['file_upload.error_no_key'])
         return
     
-    # 检查存储服务配置
-    storage_type = check_storage_service()
-    
     # 处理步骤说明
     render_processing_steps()
     
     # 文件上传 - 支持保险理赔常见文件格式
     uploaded_file = st.file_uploader(
-        i18n.get_text('file_upload.label'), 
+        T['file_upload.label'], 
         type=['pdf', 'png', 'jpg', 'jpeg', 'tiff', 'tif', 'bmp', 'dcm', 'doc', 'docx'],
-        help=i18n.get_text('file_upload.help_text')
+        help=T['file_upload.help_text']
     )
     
     if uploaded_file is not None:
         # 显示文件信息和类型识别
-        file_size = len(uploaded_file.getvalue()) / (1024 * 1024)  # MB
-        file_info = get_file_type_info(uploaded_file)
+        # 同一文件在重跑（如切换语言）时复用已计算的大小与类型信息
+        file_sig = (uploaded_file.name, uploaded_file.size)
+        if st.session_state.get('_last_file_sig') != file_sig:
+            st.session_state['_last_file_sig'] = file_sig
+            st.session_state['_last_file_info'] = (
+                uploaded_file.size / (1024 * 1024),  # MB
+                get_file_type_info(uploaded_file),
+            )
+        file_size, file_info = st.session_state['_last_file_info']
         current_lang = i18n.get_current_language()
         
         # 显示文件基本信息
@@ -301,319 +804,68 @@ def main():
             else:
                 st.warning("⚠️ Note: Image and medical imaging files will be processed through OCR and AI visual analysis, which may take longer.")
         
-        # 开始处理按钮
-        if st.button(i18n.get_text('file_upload.button'), type="primary"):
-            
+        # 开始处理按钮（后台任务运行期间禁用，避免重复提交）
+        job = st.session_state.get('_pipeline_job')
+        job_running = job is not None and job["state"] == "running"
+        if st.button(T['file_upload.button'], type="primary", disabled=job_running):
             try:
-                # 初始化步骤状态
-                steps_status = {
-                    "doc_analysis": "pending",
-                    "info_extraction": "pending", 
-                    "rule_check": "pending",
-                    "risk_analysis": "pending",
-                    "report_generation": "pending"
-                }
-                
                 # Create the complete pipeline with selected model
-                with st.spinner(i18n.get_text('processing.initializing')):
-                    pipeline = create_pipeline(model=selected_model)
+                with st.spinner(T['processing.initializing']):
+                    pipeline = _cached_pipeline(selected_model)
                     storage_service = pipeline.storage_service
                 
-                # 上传文件到存储服务
-                with st.spinner(i18n.get_text('processing.uploading')):
-                    file_path = storage_service.save_uploaded_file(uploaded_file, uploaded_file.name)
+                # 上传文件到存储服务；同一内容在本会话中只上传一次
+                with uploaded_file.getbuffer() as buffer:  # 直接读取内部缓冲区，不复制文件内容
+                    digest = hashlib.sha256(buffer).hexdigest()
+                uploads = st.session_state.setdefault('_uploads_by_digest', {})
+                with st.spinner(T['processing.uploading']):
+                    file_path = uploads.get((digest, storage_type))
+                    if file_path is None:
+                        # PDF文本解析与上传并行进行；解析结果按内容哈希缓存在解析器中，
+                        # 后续文档分析读取存储副本时直接命中缓存
+                        parse_future = None
+                        if uploaded_file.name.lower().endswith('.pdf'):
+                            parse_future = _parse_executor().submit(
+                                pipeline.pdf_parser.extract_text_from_bytes, uploaded_file.getvalue()
+                            )
+                        file_path = storage_service.save_uploaded_file(uploaded_file, uploaded_file.name)
+                        uploads[(digest, storage_type)] = file_path
+                        if parse_future is not None:
+                            # 解析失败不影响上传，文档分析阶段会重新解析并报告错误
+                            try:
+                                parse_future.result()
+                            except Exception:
+                                logger.debug("PDF pre-parse failed for %s", uploaded_file.name, exc_info=True)
                     
                     # Display success message based on storage type
                     if storage_type == "gcs":
-                        st.success(i18n.get_text('storage.uploaded_to_gcs'))
-                        st.info(i18n.get_text('storage.gcs_location', location=f"gs://{os.getenv('GCS_BUCKET')}/claims/{uploaded_file.name}"))
-                        st.markdown(i18n.get_text('storage.powered_by_gcp'))
+                        st.success(T['storage.uploaded_to_gcs'])
+                        st.info(i18n.get_text('storage.gcs_location', location=file_path))
+                        st.markdown(T['storage.powered_by_gcp'])
                     else:
                         st.success(i18n.get_text('processing.uploaded', filename=uploaded_file.name))
                 
-                # 创建进度条和状态文本
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # 渲染步骤追踪器
-                steps_container = st.container()
-                
-                # 1. 文档分析
-                steps_status["doc_analysis"] = "processing"
-                with steps_container:
-                    render_progress_tracker(steps_status)
-                
-                progress_bar.progress(20)
-                status_text.text(i18n.get_text('processing.doc_analysis'))
-                
-                try:
-                    doc_output = pipeline.doc_intel_agent.process(file_path)
-                    steps_status["doc_analysis"] = "completed"
-                except Exception as e:
-                    st.error(f"📄 文档分析失败: {str(e)}")
-                    st.warning("请检查文档格式是否为标准PDF文件")
-                    steps_status["doc_analysis"] = "failed"
-                    return
-                
-                # 2. 信息提取
-                steps_status["info_extraction"] = "processing"
-                with steps_container:
-                    render_progress_tracker(steps_status)
-                    
-                progress_bar.progress(40)
-                status_text.text(i18n.get_text('processing.info_extraction'))
-                
-                try:
-                    extraction_output = pipeline.info_extract_agent.process(doc_output)
-                    steps_status["info_extraction"] = "completed"
-                except Exception as e:
-                    st.error(f"🔍 信息提取失败: {str(e)}")
-                    st.warning("AI服务可能暂时繁忙，请稍后重试")
-                    steps_status["info_extraction"] = "failed"
-                    return
-                
-                # 3. 规则验证
-                steps_status["rule_check"] = "processing"
-                with steps_container:
-                    render_progress_tracker(steps_status)
-                    
-                progress_bar.progress(60)
-                status_text.text(i18n.get_text('processing.rule_validation'))
-                
-                try:
-                    validation_result = pipeline.rule_check_agent.process(extraction_output)
-                    steps_status["rule_check"] = "completed"
-                except Exception as e:
-                    st.error(f"📋 规则验证失败: {str(e)}")
-                    st.warning("验证规则可能需要更新，继续使用基础验证")
-                    # 创建一个基础的验证结果作为fallback
-                    from agents.rule_check import RuleValidationResult
-                    validation_result = RuleValidationResult(is_valid=True, violations=[], warnings=[])
-                    steps_status["rule_check"] = "completed_with_warnings"
-                
-                # 4. 风险分析 (多智能体协作)
-                steps_status["risk_analysis"] = "processing"
-                with steps_container:
-                    render_progress_tracker(steps_status)
-                    
-                progress_bar.progress(80)
-                status_text.text(i18n.get_text('processing.risk_analysis'))
-                
-                try:
-                    risk_analysis_output = pipeline.risk_analysis_agent.process(
-                        extraction_output, 
-                        validation_result,
-                        doc_intel_output=doc_output,  # Enable collaboration
-                        info_extract_agent=pipeline.info_extract_agent
-                    )
-                    steps_status["risk_analysis"] = "completed"
-                except Exception as e:
-                    st.error(f"⚠️ 风险分析失败: {str(e)}")
-                    st.warning("AI风险评估服务异常，使用基础风险评估")
-                    # 创建一个基础的风险分析结果作为fallback
-                    from agents.risk_analysis import RiskAnalysisOutput
-                    risk_analysis_output = RiskAnalysisOutput(
-                        risk_score=50,
-                        risk_factors=["AI服务异常，基础评估"],
-                        fraud_indicators=[],
-                        processing_priority="Standard",
-                        siu_referral=False,
-                        auto_approve_eligible=False
-                    )
-                    steps_status["risk_analysis"] = "completed_with_warnings"
-                
-                # 5. 报告生成
-                steps_status["report_generation"] = "processing"
-                with steps_container:
-                    render_progress_tracker(steps_status)
-                    
-                progress_bar.progress(90)
-                status_text.text(i18n.get_text('processing.report_generation'))
-                
-                try:
-                    # Get current language for localized report generation
-                    current_lang = i18n.get_current_language()
-                    final_report = pipeline.report_gen_agent.process(risk_analysis_output, extraction_output.extracted_data, current_lang)
-                    steps_status["report_generation"] = "completed"
-                except Exception as e:
-                    st.error(f"📊 报告生成失败: {str(e)}")
-                    st.warning("使用基础报告模板")
-                    # 创建一个基础的报告作为fallback
-                    from agents.report_gen import ReportOutput
-                    final_report = ReportOutput(
-                        recommendation="Manual_Review",
-                        confidence_score=0.5,
-                        report_content=f"""
-# 基础审计报告
-
-## 文档分析
-- 文档类型: {getattr(doc_output, 'document_type', '未知')}
-- 处理状态: 部分处理完成
-
-## 风险评估
-- 风险评分: {risk_analysis_output.risk_score}/100
-- 处理建议: 人工审核
-
-## 注意事项
-- AI服务部分异常，建议人工复核
-- 报告基于可用信息生成
-
-**建议**: 联系技术支持或重新上传文档
-                        """,
-                        source_uri=getattr(doc_output, 'source_uri', file_path),
-                        processing_priority="Standard",
-                        investigation_required=False,
-                        next_actions=["人工审核", "技术支持", "重新提交"]
-                    )
-                    steps_status["report_generation"] = "completed_with_warnings"
-                
-                # 完成
-                progress_bar.progress(100)
-                status_text.text(i18n.get_text('processing.completed'))
-                
-                with steps_container:
-                    render_progress_tracker(steps_status)
-                
-                st.success(i18n.get_text('processing.completed'))
-                
-                # 显示结果
-                st.markdown("---")
-                st.markdown("## 🎯 **Analysis Results / 分析结果**")
-                
-                # Enhanced summary metrics with multi-language support
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    risk_level = get_risk_level_text(risk_analysis_output.risk_score)
-                    st.metric(
-                        label=i18n.get_text('metrics.risk_score'),
-                        value=f"{risk_analysis_output.risk_score}/100",
-                        delta=risk_level
-                    )
-                
-                with col2:
-                    priority_text = i18n.get_priority_text(risk_analysis_output.processing_priority)
-                    st.metric(
-                        label=i18n.get_text('metrics.processing_priority'),
-                        value=priority_text
-                    )
-                
-                with col3:
-                    siu_text = i18n.get_text('metrics.needed') if risk_analysis_output.siu_referral else i18n.get_text('metrics.not_needed')
-                    st.metric(
-                        label=i18n.get_text('metrics.siu_investigation'),
-                        value=siu_text
-                    )
-                
-                with col4:
-                    recommendation_text = i18n.get_recommendation_text(final_report.recommendation)
-                    st.metric(
-                        label=i18n.get_text('metrics.final_recommendation'),
-                        value=recommendation_text,
-                        delta=f"{i18n.get_text('metrics.confidence')}: {final_report.confidence_score:.0%}"
-                    )
-                
-                # Enhanced detailed results with North American standards
-                tab1, tab2, tab3, tab4, tab5 = st.tabs([
-                    i18n.get_text('tabs.final_report'),
-                    i18n.get_text('tabs.fraud_analysis'), 
-                    i18n.get_text('tabs.extracted_info'),
-                    i18n.get_text('tabs.detailed_analysis'),
-                    i18n.get_text('tabs.technical_details')
-                ])
-                
-                with tab1:
-                    st.markdown(f"### {i18n.get_text('tabs.final_report')}")
-                    st.markdown(final_report.report_content)
-                
-                with tab2:
-                    st.markdown(f"### {i18n.get_text('fraud_analysis.title')}")
-                    
-                    # Processing Priority Indicators
-                    if risk_analysis_output.processing_priority == "Expedited":
-                        st.success(i18n.get_text('fraud_analysis.expedited_processing'))
-                    elif risk_analysis_output.processing_priority == "Enhanced_Review":
-                        st.error(i18n.get_text('fraud_analysis.enhanced_review'))
-                    else:
-                        st.info(i18n.get_text('fraud_analysis.standard_processing'))
-                    
-                    # SIU Investigation
-                    if risk_analysis_output.siu_referral:
-                        st.error(f"**{i18n.get_text('fraud_analysis.siu_required')}**")
-                        st.markdown(i18n.get_text('fraud_analysis.siu_description'))
-                    else:
-                        st.success(i18n.get_text('fraud_analysis.no_siu'))
-                    
-                    # Auto-approval eligibility
-                    if risk_analysis_output.auto_approve_eligible:
-                        st.success(f"**{i18n.get_text('fraud_analysis.auto_approve_eligible')}**")
-                        st.markdown(i18n.get_text('fraud_analysis.auto_approve_description'))
-                    else:
-                        st.warning(f"**{i18n.get_text('fraud_analysis.manual_review_required')}**")
-                        st.markdown(i18n.get_text('fraud_analysis.manual_review_description'))
-                    
-                    # Fraud indicators
-                    st.markdown(i18n.get_text('fraud_analysis.fraud_indicators'))
-                    if risk_analysis_output.fraud_indicators:
-                        for indicator in risk_analysis_output.fraud_indicators:
-                            st.warning(f"🚨 {indicator}")
-                    else:
-                        st.success(i18n.get_text('fraud_analysis.no_fraud_detected'))
-                    
-                    # Settlement estimate
-                    if hasattr(risk_analysis_output, 'settlement_estimate') and risk_analysis_output.settlement_estimate:
-                        st.markdown(i18n.get_text('fraud_analysis.settlement_estimate'))
-                        st.info(f"💰 {risk_analysis_output.settlement_estimate}")
-                
-                with tab3:
-                    st.markdown(f"### {i18n.get_text('tabs.extracted_info')}")
-                    st.json(extraction_output.extracted_data)
-                
-                with tab4:
-                    st.markdown(f"### {i18n.get_text('detailed_analysis.title')}")
-                    
-                    st.markdown(i18n.get_text('detailed_analysis.rule_validation'))
-                    if validation_result.violations:
-                        for violation in validation_result.violations:
-                            st.error(f"❌ {violation}")
-                    else:
-                        st.success(i18n.get_text('detailed_analysis.all_rules_passed'))
-                    
-                    st.markdown(i18n.get_text('detailed_analysis.risk_factors'))
-                    if risk_analysis_output.risk_factors:
-                        for factor in risk_analysis_output.risk_factors:
-                            st.warning(f"⚠️ {factor}")
-                    else:
-                        st.success(i18n.get_text('detailed_analysis.no_risk_factors'))
-                    
-                    # Next actions
-                    if hasattr(final_report, 'next_actions') and final_report.next_actions:
-                        st.markdown(i18n.get_text('detailed_analysis.next_actions'))
-                        for action in final_report.next_actions:
-                            st.info(f"📋 {action}")
-                
-                with tab5:
-                    st.markdown(f"### {i18n.get_text('technical_details.title')}")
-                    
-                    tech_data = {
-                        i18n.get_text('technical_details.document_type'): doc_output.document_type,
-                        i18n.get_text('technical_details.content_length'): f"{len(doc_output.extracted_text)} {i18n.get_text('technical_details.characters')}",
-                        i18n.get_text('technical_details.validation_status'): "✅" if not validation_result.violations else "❌",
-                        i18n.get_text('technical_details.risk_score'): f"{risk_analysis_output.risk_score}/100",
-                        i18n.get_text('technical_details.processing_model'): selected_model,
-                        i18n.get_text('technical_details.file_uri'): file_path
-                    }
-                    
-                    for key, value in tech_data.items():
-                        st.text(f"{key}: {value}")
+                # 在后台线程中运行各阶段，页面通过片段轮询进度
+                job = _start_pipeline_job(pipeline, file_path, file_sig, selected_model, digest)
             
             except Exception as e:
                 st.error(i18n.get_text('errors.processing_error', error=str(e)))
                 st.error(f"Traceback: {str(e)}")
+        
+        # 显示当前文件的处理进度或结果
+        if job is not None and job["file_sig"] == file_sig:
+            if job["state"] == "running":
+                _job_progress_fragment()
+            else:
+                _render_job_progress(job, T)
+                last_results = st.session_state.get('last_results')
+                if job["state"] == "done" and last_results and last_results["file_sig"] == file_sig:
+                    st.success(T['processing.completed'])
+                    _render_results()
     
     # 页脚
     st.markdown("---")
-    st.markdown(f"<center>{i18n.get_text('footer')}</center>", unsafe_allow_html=True)
+    st.markdown(f"<center>{T['footer']}</center>", unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -19,6 +19,7 @@ Examples | 示例:
 import os
 import sys
 import argparse
+import asyncio
 import time
 from pathlib import Path
 from typing import Optional
@@ -26,9 +27,11 @@ from typing import Optional
 # Add project root to path
 sys.path.append(str(Path(__file__).parent))
 
-from pipeline import ClaimProcessingPipeline, create_pipeline
+from pipeline import ClaimProcessingPipeline, configure_logging, get_pipeline
 from services.storage_service import get_storage_service
-from utils.i18n import i18n
+from utils.i18n import get_i18n
+
+i18n = get_i18n()
 
 
 def print_banner(lang: str = 'en'):
@@ -78,6 +81,44 @@ def print_system_info(lang: str = 'en'):
     print()
 
 
+AGENT_NAMES = {
+    'doc_intel': 'Document Intelligence | 文档智能',
+    'info_extract': 'Information Extraction | 信息提取', 
+    'rule_check': 'Rule Validation | 规则验证',
+    'risk_analysis': 'Risk Analysis | 风险分析',
+    'report_gen': 'Report Generation | 报告生成'
+}
+
+
+async def _stream_agent_results(pipeline: ClaimProcessingPipeline, file_path: str, lang: str) -> dict:
+    """Print each agent's status as it completes and return all results | 逐个输出智能体结果"""
+    if lang == 'zh':
+        print("📊 处理结果摘要:")
+    else:
+        print("📊 Processing Results Summary:")
+    
+    result = {}
+    async for agent, agent_result in pipeline.stream_for_demo(file_path, lang):
+        result[agent] = agent_result
+        status = "✅" if agent_result.get('success', False) else "❌"
+        print(f"  {status} {AGENT_NAMES.get(agent, agent)}", flush=True)
+        
+        # Show risk score if available
+        if agent == 'risk_analysis' and 'risk_score' in agent_result:
+            risk_score = agent_result['risk_score']
+            if lang == 'zh':
+                print(f"      🎯 风险评分: {risk_score}/100")
+            else:
+                print(f"      🎯 Risk Score: {risk_score}/100")
+    
+    # The report file is written in the background; wait for it only now
+    report = result.get('report_gen')
+    if report and 'report_save' in report:
+        report['report_path'] = await report.pop('report_save')
+    
+    return result
+
+
 def demonstrate_file_processing(file_path: str, model: str, lang: str = 'en'):
     """Demonstrate file processing | 演示文件处理"""
     i18n.set_language(lang)
@@ -86,7 +127,10 @@ def demonstrate_file_processing(file_path: str, model: str, lang: str = 'en'):
     print(f"🔄 {i18n.get_text('processing_demo')}")
     print("=" * 60)
     
-    if not os.path.exists(file_path):
+    path = Path(file_path)
+    try:
+        file_stat = path.stat()  # one stat call for existence and size
+    except OSError:
         if lang == 'zh':
             print(f"❌ 文件不存在: {file_path}")
             print("💡 请使用有效的文件路径或使用默认示例文件")
@@ -96,18 +140,18 @@ def demonstrate_file_processing(file_path: str, model: str, lang: str = 'en'):
         return False
     
     # Display file info
-    file_size = os.path.getsize(file_path) / 1024  # KB
-    file_ext = Path(file_path).suffix.upper()
+    file_size = file_stat.st_size / 1024  # KB
+    file_ext = path.suffix.upper()
     
     if lang == 'zh':
-        print(f"📄 处理文件: {Path(file_path).name}")
+        print(f"📄 处理文件: {path.name}")
         print(f"📊 文件大小: {file_size:.1f} KB")
         print(f"🎯 文件类型: {file_ext}")
         print(f"🤖 AI模型: {model}")
         print()
         print("🚀 启动多智能体处理流水线...")
     else:
-        print(f"📄 Processing File: {Path(file_path).name}")
+        print(f"📄 Processing File: {path.name}")
         print(f"📊 File Size: {file_size:.1f} KB")
         print(f"🎯 File Type: {file_ext}")
         print(f"🤖 AI Model: {model}")
@@ -117,15 +161,17 @@ def demonstrate_file_processing(file_path: str, model: str, lang: str = 'en'):
     print("-" * 40)
     
     try:
-        # Initialize pipeline
-        pipeline = create_pipeline(model=model)
+        # Reuse the pipeline for this model across files
+        pipeline = get_pipeline(model)
         
         # Process file with timer
         start_time = time.time()
 
         # In a real app, you'd upload and get a URI. Here we pass the local path.
         # The pipeline internally handles moving it to storage if needed.
-        result, report_path = pipeline.run_for_demo(file_path, lang)
+        # Each agent's status is printed as soon as that agent finishes.
+        result = asyncio.run(_stream_agent_results(pipeline, file_path, lang))
+        report_path = result.get('report_gen', {}).get('report_path')
         
         end_time = time.time()
         
@@ -135,35 +181,8 @@ def demonstrate_file_processing(file_path: str, model: str, lang: str = 'en'):
         print("-" * 40)
         if lang == 'zh':
             print(f"✅ 处理完成！耗时: {processing_time:.2f}秒")
-            print()
-            print("📊 处理结果摘要:")
         else:
             print(f"✅ Processing Complete! Time: {processing_time:.2f}s")
-            print()
-            print("📊 Processing Results Summary:")
-        
-        # Show agent results
-        agents = ['doc_intel', 'info_extract', 'rule_check', 'risk_analysis', 'report_gen']
-        agent_names = {
-            'doc_intel': 'Document Intelligence | 文档智能',
-            'info_extract': 'Information Extraction | 信息提取', 
-            'rule_check': 'Rule Validation | 规则验证',
-            'risk_analysis': 'Risk Analysis | 风险分析',
-            'report_gen': 'Report Generation | 报告生成'
-        }
-        
-        for agent, agent_result in result.items():
-            status = "✅" if agent_result.get('success', False) else "❌"
-            name = agent_names.get(agent, agent)
-            print(f"  {status} {name}")
-            
-            # Show risk score if available
-            if agent == 'risk_analysis' and 'risk_score' in agent_result:
-                risk_score = agent_result['risk_score']
-                if lang == 'zh':
-                    print(f"      🎯 风险评分: {risk_score}/100")
-                else:
-                    print(f"      🎯 Risk Score: {risk_score}/100")
         
         # Show collaboration info
         if result.get('risk_analysis', {}).get('collaboration_used'):
@@ -221,7 +240,9 @@ def show_sample_files(lang: str = 'en'):
             print("❌ Sample files directory not found")
         return
     
-    files = list(sample_dir.glob("*"))
+    # scandir entries carry their file type, so non-files are skipped without extra stat calls
+    with os.scandir(sample_dir) as entries:
+        files = [(entry.name, entry.stat().st_size) for entry in entries if entry.is_file()]
     if not files:
         if lang == 'zh':
             print("❌ 没有找到示例文件")
@@ -229,10 +250,8 @@ def show_sample_files(lang: str = 'en'):
             print("❌ No sample files found")
         return
     
-    for i, file_path in enumerate(files, 1):
-        if file_path.is_file():
-            size = file_path.stat().st_size / 1024  # KB
-            print(f"  {i}. {file_path.name} ({size:.1f} KB)")
+    for i, (name, size) in enumerate(files, 1):
+        print(f"  {i}. {name} ({size / 1024:.1f} KB)")
     
     print()
 
@@ -270,6 +289,7 @@ def main():
     )
     
     args = parser.parse_args()
+    configure_logging()
     
     # Set language
     i18n.set_language(args.lang)
@@ -1,27 +1,38 @@
 """The main orchestration pipeline for processing an insurance claim."""
 
-from agents.doc_intel import DocIntelAgent
+from agents.doc_intel import DocIntelAgent, merge_doc_outputs
 from agents.info_extract import InfoExtractAgent
 from agents.report_gen import ReportGenAgent, ReportOutput
 from agents.risk_analysis import RiskAnalysisAgent
 from agents.rule_check import RuleCheckAgent
+from agents.unified_audit import UnifiedAuditAgent
 from services.gemini_client import GeminiClient
 from services.storage_service import LocalStorageService
-from utils.pdf_parser import PDFParser
+from utils.pdf_parser import PDFParser, get_pdf_parser
+from aiolimiter import AsyncLimiter
 from pathlib import Path
+from typing import AsyncIterator, Tuple
+import asyncio
+import atexit
+import functools
+import logging
 import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class ClaimProcessingPipeline:
     """
     Orchestrates the entire claim processing workflow by executing a sequence of agents.
     """
 
-    def __init__(self, gemini_client: GeminiClient, storage_service: LocalStorageService, pdf_parser: PDFParser):
+    def __init__(self, gemini_client: GeminiClient, storage_service: LocalStorageService, pdf_parser: PDFParser, use_unified_pipeline: bool = False):
         """
         Initialize the pipeline with required services and agents.
         
@@ -29,9 +40,12 @@ class ClaimProcessingPipeline:
             gemini_client: Client for AI model interactions
             storage_service: Service for file storage operations
             pdf_parser: Service for PDF parsing operations
+            use_unified_pipeline: If True, run() replaces the extraction, rule
+                check and risk analysis steps with a single UnifiedAuditAgent call
         """
         self.storage_service = storage_service
         self.pdf_parser = pdf_parser
+        self.use_unified_pipeline = use_unified_pipeline
         
         # Initialize all agents with their dependencies
         self.doc_intel_agent = DocIntelAgent(storage_service, pdf_parser, gemini_client)
@@ -39,59 +53,130 @@ class ClaimProcessingPipeline:
         self.rule_check_agent = RuleCheckAgent()
         self.risk_analysis_agent = RiskAnalysisAgent(gemini_client)
         self.report_gen_agent = ReportGenAgent(gemini_client)
+        self.unified_agent = UnifiedAuditAgent(gemini_client, self.rule_check_agent, self.risk_analysis_agent)
+
+    async def validate_and_prepare(self, extraction_output, doc_intel_output=None):
+        """
+        Run rule validation and the validation-independent part of risk analysis
+        concurrently, since both only need the extraction output.
+        
+        Returns:
+            tuple: (ValidationResult, prepared risk analysis inputs)
+        """
+        return await asyncio.gather(
+            asyncio.to_thread(self.rule_check_agent.process, extraction_output),
+            asyncio.to_thread(self.risk_analysis_agent.prepare, extraction_output, doc_intel_output),
+        )
 
-    def run(self, file_uri: str, language: str = "中文") -> ReportOutput:
+    def run(self, file_uri, language: str = "中文") -> ReportOutput:
         """
         Execute the complete claim processing pipeline.
         
         Args:
-            file_uri: URI of the uploaded file to process
+            file_uri: URI of the uploaded file to process, or a list of URIs for a
+                multi-document claim (analyzed together with one batched request)
             language: Language for the final report generation
             
         Returns:
             ReportOutput: Final generated report with recommendation
         """
-        print("🚀 Starting claim processing pipeline...")
+        return asyncio.run(self.arun(file_uri, language))
+
+    async def arun(self, file_uri, language: str = "中文") -> ReportOutput:
+        """Async version of run(); blocking agent calls run in worker threads."""
+        return await self._run_async(file_uri, language)
+
+    async def arun_many(self, file_uris, language: str = "中文", concurrency: int = 8, claims_per_minute: int = 100):
+        """
+        Process several independent claims concurrently.
+        
+        At most ``concurrency`` claims are in flight, and new claims start at no
+        more than ``claims_per_minute`` per minute. The limit counts claims, not
+        Gemini requests: each claim makes four to five model calls, so keep
+        ``claims_per_minute`` at or below a fifth of the model's requests-per-minute quota.
+        
+        Returns:
+            One entry per URI, in order: the ReportOutput, or the exception that
+            claim raised (so one failed claim does not discard the others).
+        """
+        limiter = AsyncLimiter(claims_per_minute, 60)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run_one(file_uri):
+            async with semaphore, limiter:
+                return await self.arun(file_uri, language)
+        
+        return await asyncio.gather(*(run_one(uri) for uri in file_uris), return_exceptions=True)
+
+    async def _run_async(self, file_uri, language: str) -> ReportOutput:
+        """Implementation of arun(); blocking agent calls run in worker threads."""
+        logger.info("🚀 Starting claim processing pipeline...")
         
         # Step 1: Document Intelligence Analysis
-        print("\n📄 Step 1: Document Intelligence Analysis...")
-        doc_intel_output = self.doc_intel_agent.process(file_uri)
-        print(f"✅ Document analysis completed")
-        print(f"   - Document type: {doc_intel_output.doc_type}")
-        print(f"   - Content length: {len(doc_intel_output.content)} characters")
+        logger.info("\n📄 Step 1: Document Intelligence Analysis...")
+        if isinstance(file_uri, (list, tuple)) and len(file_uri) > 1:
+            doc_outputs = await asyncio.to_thread(self.doc_intel_agent.process_batch, list(file_uri))
+            doc_intel_output = merge_doc_outputs(doc_outputs)
+        else:
+            if isinstance(file_uri, (list, tuple)):
+                file_uri = file_uri[0]
+            doc_intel_output = await asyncio.to_thread(self.doc_intel_agent.process, file_uri)
+        logger.info("✅ Document analysis completed")
+        logger.info("   - Document type: %s", doc_intel_output.doc_type)
+        logger.info("   - Content length: %d characters", len(doc_intel_output.content))
+
+        if self.use_unified_pipeline:
+            # Steps 2-4 in a single LLM call, reconciled with the deterministic rules
+            logger.info("\n🧩 Steps 2-4: Unified extraction, validation and risk analysis...")
+            unified_output = await asyncio.to_thread(self.unified_agent.process, doc_intel_output)
+            extraction_output = unified_output.extraction_output
+            validation_result, risk_analysis_output = self.unified_agent.reconcile(unified_output, doc_intel_output)
+            logger.info("✅ Unified audit completed")
+            logger.info("   - Violations: %d", len(validation_result.violations))
+            logger.info("   - Risk score: %s/100", risk_analysis_output.risk_score)
+        else:
+            extraction_output, validation_result, risk_analysis_output = await self._run_agent_chain(doc_intel_output)
+
+        # Step 5: Final Report Generation
+        logger.info("\n📊 Step 5: Final Report Generation...")
+        final_report = await asyncio.to_thread(
+            self.report_gen_agent.process, risk_analysis_output, extraction_output.extracted_data, language=language
+        )
+        logger.info("✅ Final report generated")
+        logger.info("   - Recommendation: %s", final_report.recommendation)
+        logger.info("   - Confidence: %.2f", final_report.confidence_score)
 
+        return final_report
+
+    async def _run_agent_chain(self, doc_intel_output):
+        """Steps 2-4 with the individual extraction, rule check and risk analysis agents."""
         # Step 2: Information Extraction
-        print("\n🔍 Step 2: Information Extraction...")
-        extraction_output = self.info_extract_agent.process(doc_intel_output)
-        print(f"✅ Information extraction completed")
-        print(f"   - Extracted fields: {list(extraction_output.extracted_data.keys())}")
-
-        # Step 3: Rule Validation
-        print("\n📋 Step 3: Rule Validation...")
-        validation_result = self.rule_check_agent.process(extraction_output)
-        print(f"✅ Rule validation completed")
-        print(f"   - Valid: {validation_result.is_valid}")
-        print(f"   - Violations: {len(validation_result.violations)}")
+        logger.info("\n🔍 Step 2: Information Extraction...")
+        extraction_output = await asyncio.to_thread(self.info_extract_agent.process, doc_intel_output)
+        logger.info("✅ Information extraction completed")
+        logger.info("   - Extracted fields: %s", list(extraction_output.extracted_data.keys()))
+
+        # Step 3: Rule Validation (overlapped with risk analysis preparation)
+        logger.info("\n📋 Step 3: Rule Validation...")
+        validation_result, risk_prepared = await self.validate_and_prepare(extraction_output, doc_intel_output)
+        logger.info("✅ Rule validation completed")
+        logger.info("   - Valid: %s", validation_result.is_valid)
+        logger.info("   - Violations: %d", len(validation_result.violations))
 
         # Step 4: Risk Analysis (with collaborative capabilities)
-        print("\n⚠️  Step 4: Risk Analysis...")
-        risk_analysis_output = self.risk_analysis_agent.process(
+        logger.info("\n⚠️  Step 4: Risk Analysis...")
+        risk_analysis_output = await asyncio.to_thread(
+            self.risk_analysis_agent.process,
             extraction_output, 
             validation_result,
             doc_intel_output=doc_intel_output,  # Pass original document for collaboration
-            info_extract_agent=self.info_extract_agent  # Enable collaboration
+            info_extract_agent=self.info_extract_agent,  # Enable collaboration
+            prepared=risk_prepared
         )
-        print(f"✅ Risk analysis completed")
-        print(f"   - Risk score: {risk_analysis_output.risk_score}/100")
+        logger.info("✅ Risk analysis completed")
+        logger.info("   - Risk score: %s/100", risk_analysis_output.risk_score)
 
-        # Step 5: Final Report Generation
-        print("\n📊 Step 5: Final Report Generation...")
-        final_report = self.report_gen_agent.process(risk_analysis_output, extraction_output.extracted_data, language=language)
-        print(f"✅ Final report generated")
-        print(f"   - Recommendation: {final_report.recommendation}")
-        print(f"   - Confidence: {final_report.confidence_score:.2f}")
-
-        return final_report
+        return extraction_output, validation_result, risk_analysis_output
 
     def run_for_demo(self, file_path: str, language: str = "中文"):
         """
@@ -106,68 +191,126 @@ class ClaimProcessingPipeline:
             - dict: A dictionary with results from each agent.
             - str: The path to the saved final report.
         """
-        results = {}
+        async def collect():
+            results = {agent: result async for agent, result in self.stream_for_demo(file_path, language)}
+            report = results['report_gen']
+            report['report_path'] = await report.pop('report_save')
+            return results
         
+        results = asyncio.run(collect())
+        return results, results['report_gen']['report_path']
+
+    async def stream_for_demo(self, file_path: str, language: str = "中文") -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Execute the pipeline for demonstration purposes, yielding each agent's
+        result as soon as that agent finishes.
+        
+        Args:
+            file_path: Local path to the file to process.
+            language: Language for the final report generation.
+            
+        Yields:
+            (agent name, result dict) tuples in pipeline order. The
+            ``report_gen`` result carries the still-running report save as
+            ``report_save``, an asyncio task that resolves to the report path;
+            callers must await it before their event loop closes.
+        """
         # Upload file first
-        file_uri = self.storage_service.save_file(Path(file_path))
+        file_uri = await asyncio.to_thread(self.storage_service.save_file, Path(file_path))
         
         # Step 1: Document Intelligence
-        doc_intel_output = self.doc_intel_agent.process(file_uri)
-        results['doc_intel'] = {
+        doc_intel_output = await asyncio.to_thread(self.doc_intel_agent.process, file_uri)
+        yield 'doc_intel', {
             "success": True, 
             "doc_type": doc_intel_output.doc_type,
             "content_length": len(doc_intel_output.content)
         }
 
         # Step 2: Information Extraction
-        extraction_output = self.info_extract_agent.process(doc_intel_output)
-        results['info_extract'] = {
+        extraction_output = await asyncio.to_thread(self.info_extract_agent.process, doc_intel_output)
+        yield 'info_extract', {
             "success": True,
             "extracted_fields": list(extraction_output.extracted_data.keys())
         }
 
-        # Step 3: Rule Validation
-        validation_result = self.rule_check_agent.process(extraction_output)
-        results['rule_check'] = {
+        # Step 3: Rule Validation (overlapped with risk analysis preparation)
+        validation_result, risk_prepared = await self.validate_and_prepare(extraction_output, doc_intel_output)
+        yield 'rule_check', {
             "success": validation_result.is_valid,
             "violations": len(validation_result.violations)
         }
 
         # Step 4: Risk Analysis
-        risk_analysis_output = self.risk_analysis_agent.process(
+        risk_analysis_output = await asyncio.to_thread(
+            self.risk_analysis_agent.process,
             extraction_output, 
             validation_result,
             doc_intel_output=doc_intel_output,
-            info_extract_agent=self.info_extract_agent
+            info_extract_agent=self.info_extract_agent,
+            prepared=risk_prepared
         )
-        results['risk_analysis'] = {
+        yield 'risk_analysis', {
             "success": True,
             "risk_score": risk_analysis_output.risk_score,
             "collaboration_used": getattr(risk_analysis_output, 'collaboration_used', False)
         }
 
         # Step 5: Final Report Generation
-        final_report = self.report_gen_agent.process(risk_analysis_output, extraction_output.extracted_data, language=language)
-        
-        # Save report to a file
-        report_path = self.storage_service.save_report(final_report.report_content, Path(file_path).name)
+        final_report = await asyncio.to_thread(
+            self.report_gen_agent.process, risk_analysis_output, extraction_output.extracted_data, language=language
+        )
         
-        results['report_gen'] = {
+        # Save report to a file in the background; the result is yielded right
+        # away and the caller awaits the pending save once it is done with it
+        save_task = asyncio.create_task(
+            self.storage_service.save_report_async(final_report.report_content, Path(file_path).name)
+        )
+        yield 'report_gen', {
             "success": True,
             "recommendation": final_report.recommendation,
             "confidence": final_report.confidence_score,
-            "report_path": report_path
+            "report_save": save_task,
         }
-        
-        return results, report_path
 
 
-def create_pipeline(model: str = "gemini-1.5-flash") -> ClaimProcessingPipeline:
+@functools.lru_cache(maxsize=1)
+def configure_logging() -> QueueListener:
+    """
+    Send pipeline and service log messages to stdout through a queue.
+    
+    Meant for the command-line entry points only: it sets the level of the
+    ``pipeline`` and ``services`` loggers and stops them propagating, which
+    would override the logging setup of a host application such as Streamlit.
+    
+    Agent threads only enqueue records; a single listener thread writes them,
+    so concurrent claims never contend for the stdout lock. Records are printed
+    as bare messages to keep the emoji progress lines unchanged. Per-request
+    Gemini messages are logged at DEBUG and stay hidden at the INFO level.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    queue_handler = QueueHandler(log_queue)
+    for name in (__name__, "services"):
+        package_logger = logging.getLogger(name)
+        package_logger.addHandler(queue_handler)
+        package_logger.setLevel(logging.INFO)
+        package_logger.propagate = False
+    return listener
+
+
+def create_pipeline(model: str = "gemini-1.5-flash", use_unified_pipeline: bool = None) -> ClaimProcessingPipeline:
     """
     Factory function to create a fully configured pipeline instance.
     
     Args:
         model: The Gemini model to use (e.g., "gemini-1.5-flash", "gemini-2.5-flash")
+        use_unified_pipeline: Use the single-call UnifiedAuditAgent in run().
+            Defaults to the USE_UNIFIED_PIPELINE environment variable.
     
     Returns:
         ClaimProcessingPipeline: Ready-to-use pipeline instance
@@ -175,56 +318,91 @@ def create_pipeline(model: str = "gemini-1.5-flash") -> ClaimProcessingPipeline:
     # Initialize services with selected model
     gemini_client = GeminiClient(model=model)
     
+    # Optionally answer repeated prompts from an in-memory response cache
+    from services.gemini_cache import CachedGeminiClient, llm_cache_enabled, load_warmup_prompts
+    if llm_cache_enabled():
+        gemini_client = CachedGeminiClient(gemini_client)
+        warmup_prompts = load_warmup_prompts()
+        if warmup_prompts:
+            gemini_client.warmup_in_background(warmup_prompts)
+    
     # Use factory method to automatically select storage service
     # Prioritizes GCS if configured, falls back to local storage
     from services.storage_service import get_storage_service
     storage_service = get_storage_service()
     
-    pdf_parser = PDFParser()
+    pdf_parser = get_pdf_parser()
+    
+    if use_unified_pipeline is None:
+        use_unified_pipeline = os.getenv("USE_UNIFIED_PIPELINE", "").strip().lower() in ("1", "true", "yes")
     
     # Create and return pipeline
-    return ClaimProcessingPipeline(gemini_client, storage_service, pdf_parser)
+    return ClaimProcessingPipeline(gemini_client, storage_service, pdf_parser, use_unified_pipeline=use_unified_pipeline)
+
+
+@functools.lru_cache(maxsize=4)
+def get_pipeline(model: str = "gemini-1.5-flash") -> ClaimProcessingPipeline:
+    """
+    Return a shared pipeline for the given model, creating it on first use.
+    
+    Agents and clients hold no per-claim state, so one instance per model can
+    process any number of files in the same process.
+    """
+    return create_pipeline(model=model)
 
 
 if __name__ == "__main__":
-    # Get file path from command line argument or use default
+    # Get file paths from command line arguments or use default
     if len(sys.argv) > 1:
-        file_path = sys.argv[1]
+        file_paths = sys.argv[1:]
     else:
         # Interactive mode - ask user for file path
-        file_path = input("请输入PDF文件路径: ").strip()
+        file_paths = [input("请输入PDF文件路径: ").strip()]
     
-    if not file_path or not Path(file_path).exists():
+    if not all(file_paths) or not all(Path(p).exists() for p in file_paths):
         print("❌ 错误：请提供有效的文件路径")
         sys.exit(1)
     
     try:
         # Create pipeline
         print("🔧 初始化处理管道...")
+        configure_logging()
         pipeline = create_pipeline()
         print("✅ 管道初始化成功")
         
-        # Upload file to storage
-        print(f"📤 上传文件: {Path(file_path).name}")
-        file_uri = pipeline.storage_service.upload_file(file_path, "test_claims")
-        print(f"✅ 文件已上传到: {file_uri}")
+        # Upload files to storage
+        print(f"📤 上传文件: {', '.join(Path(p).name for p in file_paths)}")
+        file_uris = pipeline.storage_service.save_files([Path(p) for p in file_paths])
+        for file_uri in file_uris:
+            print(f"✅ 文件已上传到: {file_uri}")
         
-        # Run the pipeline
+        # Run the pipeline; several files are processed as independent claims concurrently
         print("\n🚀 开始执行完整的AI处理流程...")
         print("-" * 40)
         
-        final_report = pipeline.run(file_uri)
+        if len(file_uris) == 1:
+            results = [pipeline.run(file_uris[0])]
+        else:
+            results = asyncio.run(pipeline.arun_many(file_uris))
         
         # Display results
-        print("\n" + "="*50)
-        print("📋 最终处理结果")
-        print("="*50)
-        print(final_report.report_content)
+        failed = 0
+        for file_path, final_report in zip(file_paths, results):
+            print("\n" + "="*50)
+            print(f"📋 最终处理结果: {Path(file_path).name}")
+            print("="*50)
+            if isinstance(final_report, Exception):
+                failed += 1
+                print(f"❌ 处理失败: {final_report}")
+            else:
+                print(final_report.report_content)
         
+        if failed:
+            sys.exit(1)
         print("\n✅ 管道执行完成！")
         
     except Exception as e:
         print(f"❌ 管道执行失败: {e}")
         import traceback
         traceback.print_exc()
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,252 @@
+"""Response cache in front of :class:`GeminiClient`.
+
+Identical prompts sent to the same model (common when the same claim form is
+analysed repeatedly) are answered from memory instead of calling Gemini again.
+Entries are keyed by SHA-256 over (model, system instruction, cached-content
+name, prompt, generation kwargs), evicted in LRU order once ``max_entries`` is
+reached and expire after ``ttl`` seconds.
+
+Two optional tiers sit behind the exact-match cache:
+
+* ``LLM_SEMANTIC_CACHE_THRESHOLD`` (e.g. ``0.92``) also answers prompts whose
+  embedding has at least that cosine similarity to a recently cached prompt.
+  Only calls made with ``semantic=True`` take part. Claim prompts built from
+  the same template are near-identical yet need different answers, so the
+  agents never opt in; it is meant for claim-independent prompts only.
+* ``LLM_CACHE_DIR`` persists responses with ``diskcache`` so hits survive
+  restarts (skipped with a warning if ``diskcache`` is not installed).
+
+Enabled from ``create_pipeline`` when ``ENABLE_LLM_CACHE=1``. If
+``LLM_WARMUP_FILE`` points to a JSON list of prompts, those are sent once in a
+background thread at startup so the first matching request is already cached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+from services.gemini_client import GeminiClient
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED_ENV = "ENABLE_LLM_CACHE"
+CACHE_MAX_ENTRIES_ENV = "LLM_CACHE_MAX_ENTRIES"
+CACHE_TTL_ENV = "LLM_CACHE_TTL"
+WARMUP_FILE_ENV = "LLM_WARMUP_FILE"
+SEMANTIC_THRESHOLD_ENV = "LLM_SEMANTIC_CACHE_THRESHOLD"
+CACHE_DIR_ENV = "LLM_CACHE_DIR"
+
+EMBEDDING_MODEL = "models/text-embedding-004"
+# Number of recent prompts compared against in the semantic tier
+SEMANTIC_WINDOW = 1024
+
+
+def llm_cache_enabled() -> bool:
+    """Return True if the response cache is switched on via the environment."""
+    return os.getenv(CACHE_ENABLED_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def load_warmup_prompts(path: str | Path | None = None) -> list[str]:
+    """Read the warm-up prompt list, returning [] if none is configured."""
+    path = path or os.getenv(WARMUP_FILE_ENV)
+    if not path or not Path(path).is_file():
+        return []
+    try:
+        prompts = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning("⚠️ Could not read LLM warm-up prompts from %s: %s", path, e)
+        return []
+    return [p for p in prompts if isinstance(p, str) and p]
+
+
+class CachedGeminiClient:
+    """Drop-in wrapper around :class:`GeminiClient` that memoizes responses."""
+
+    def __init__(
+        self,
+        client: GeminiClient,
+        *,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+        semantic_threshold: float | None = None,
+        cache_dir: str | None = None,
+    ) -> None:
+        self._client = client
+        self._max_entries = max_entries or int(os.getenv(CACHE_MAX_ENTRIES_ENV, "10000"))
+        self._ttl = ttl if ttl is not None else float(os.getenv(CACHE_TTL_ENV, "3600"))
+        # key -> (expires_at, response)
+        self._entries: OrderedDict[bytes, tuple[float, str]] = OrderedDict()
+        # Agents may run in worker threads, so guard the shared dict
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if semantic_threshold is None and os.getenv(SEMANTIC_THRESHOLD_ENV):
+            semantic_threshold = float(os.getenv(SEMANTIC_THRESHOLD_ENV))
+        self._semantic_threshold = semantic_threshold
+        # (key, L2-normalized prompt embedding) for recent opted-in prompts
+        self._embeddings: deque[tuple[bytes, np.ndarray]] = deque(maxlen=SEMANTIC_WINDOW)
+        self.semantic_hits = 0
+
+        self._disk = self._open_disk_cache(cache_dir or os.getenv(CACHE_DIR_ENV))
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose model_name, model, etc. of the wrapped client
+        return getattr(self._client, name)
+
+    def _key(self, prompt: str, kwargs: dict[str, Any]) -> bytes:
+        # Everything that shapes the answer besides the prompt is part of the key,
+        # since LLM_CACHE_DIR may be shared by clients configured differently
+        digest = hashlib.sha256()
+        digest.update(self._client.model_name.encode())
+        digest.update(b"\0")
+        digest.update((self._client.system_instruction or "").encode())
+        digest.update(b"\0")
+        digest.update(str(getattr(self._client.model, "cached_content", None) or "").encode())
+        digest.update(b"\0")
+        digest.update(prompt.encode())
+        if kwargs:
+            digest.update(b"\0")
+            digest.update(repr(sorted(kwargs.items())).encode())
+        return digest.digest()
+
+    @staticmethod
+    def _open_disk_cache(cache_dir: str | None) -> Any:
+        if not cache_dir:
+            return None
+        try:
+            import diskcache
+        except ImportError:
+            logger.warning("⚠️ %s is set but diskcache is not installed; using memory cache only", CACHE_DIR_ENV)
+            return None
+        return diskcache.Cache(cache_dir)
+
+    def _lookup(self, key: bytes) -> str | None:
+        """Return the live in-memory response for key (caller holds the lock)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _store(self, key: bytes, response: str) -> None:
+        """Insert a response in memory (caller holds the lock)."""
+        self._entries[key] = (time.monotonic() + self._ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _embed(self, prompt: str) -> np.ndarray | None:
+        import google.generativeai as genai
+
+        try:
+            result = genai.embed_content(model=EMBEDDING_MODEL, content=prompt)
+        except Exception as e:
+            logger.warning("⚠️ Prompt embedding failed, skipping semantic cache: %s", e)
+            return None
+        vector = np.asarray(result["embedding"], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _semantic_lookup(self, query: np.ndarray) -> str | None:
+        with self._lock:
+            if not self._embeddings:
+                return None
+            keys, vectors = zip(*self._embeddings)
+        scores = np.stack(vectors) @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self._semantic_threshold:
+            return None
+        with self._lock:
+            return self._lookup(keys[best])
+
+    def generate_content(self, *, prompt: str, semantic: bool = False, **kwargs: Any) -> str:
+        """Return a cached response for the prompt, calling Gemini on a miss.
+
+        ``semantic=True`` lets a sufficiently similar earlier prompt answer this
+        one. Never use it for prompts that embed claim data: two claims from the
+        same template would share one answer.
+        """
+        key = self._key(prompt, kwargs)
+
+        with self._lock:
+            response = self._lookup(key)
+            if response is not None:
+                self.hits += 1
+                return response
+
+        if self._disk is not None:
+            response = self._disk.get(key)
+            if response is not None:
+                with self._lock:
+                    self._store(key, response)
+                    self.hits += 1
+                return response
+
+        # Similar prompts only stand in for opted-in calls with no generation options
+        query = None
+        if semantic and self._semantic_threshold is not None and not kwargs:
+            query = self._embed(prompt)
+            if query is not None:
+                response = self._semantic_lookup(query)
+                if response is not None:
+                    with self._lock:
+                        self.hits += 1
+                        self.semantic_hits += 1
+                    return response
+
+        with self._lock:
+            self.misses += 1
+
+        # Call outside the lock so concurrent agents are not serialized
+        response = self._client.generate_content(prompt=prompt, **kwargs)
+
+        with self._lock:
+            self._store(key, response)
+            if query is not None:
+                self._embeddings.append((key, query))
+        if self._disk is not None:
+            self._disk.set(key, response, expire=self._ttl)
+        return response
+
+    def warmup(self, prompts: Iterable[str]) -> int:
+        """Populate the cache for the given prompts; returns how many succeeded."""
+        warmed = 0
+        for prompt in prompts:
+            try:
+                self.generate_content(prompt=prompt)
+            except Exception as e:
+                logger.warning("⚠️ LLM cache warm-up request failed: %s", e)
+                continue
+            warmed += 1
+        return warmed
+
+    def warmup_in_background(self, prompts: Iterable[str]) -> threading.Thread:
+        """Run :meth:`warmup` in a daemon thread so startup is not blocked."""
+        thread = threading.Thread(
+            target=self.warmup, args=(list(prompts),), name="llm-cache-warmup", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._embeddings.clear()
+        if self._disk is not None:
+            self._disk.clear()
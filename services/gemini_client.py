@@ -2,26 +2,143 @@
 
 Handles authentication via environment variable ``GEMINI_API_KEY``.
 Wraps the Google Generative AI Python SDK and provides simple generate_content
-helper with basic retry/backoff.
+helper with basic retry/backoff, plus an async variant, streaming variants and
+a batch helper that sends independent prompts concurrently.
 
 NOTE: Requires ``google-generativeai`` package.
 """
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import logging
 import os
-from typing import Any
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator, Sequence
 
-import google.generativeai as genai
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+# google.generativeai pulls in gRPC and takes hundreds of ms to import; it is
+# loaded on first use so CLI entry points (--help, argument errors) stay fast
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
+__all__ = [
+    "API_KEY_ENV",
+    "EmptyResponseError",
+    "GeminiClient",
+    "generate_content",
+]
 
 API_KEY_ENV = "GEMINI_API_KEY"
+# "grpc" (protobuf over one multiplexed HTTP/2 channel) or "rest"
+TRANSPORT_ENV = "GEMINI_TRANSPORT"
+DEFAULT_TRANSPORT = "grpc"
+
+logger = logging.getLogger(__name__)
+
+
+class EmptyResponseError(RuntimeError):
+    """Gemini returned a response without text."""
+
+
+_MAX_RETRY_AFTER = 60.0
+_backoff = wait_random_exponential(multiplier=0.5, max=30)
+
+
+@functools.lru_cache(maxsize=1)
+def _retryable_errors() -> tuple[type[BaseException], ...]:
+    """Transient failures worth retrying; auth, location and bad-request errors are not."""
+    from google.api_core.exceptions import DeadlineExceeded, ResourceExhausted, ServiceUnavailable
+
+    return (ResourceExhausted, ServiceUnavailable, DeadlineExceeded, EmptyResponseError)
+
+
+def _is_retryable(err: BaseException) -> bool:
+    # generate_content re-raises SDK errors as RuntimeError; inspect the cause
+    retryable = _retryable_errors()
+    return isinstance(err, retryable) or isinstance(err.__cause__, retryable)
+
+
+def _retry_delay(detail: Any) -> float | None:
+    """Seconds from a google.rpc.RetryInfo error detail (protobuf or REST JSON form)."""
+    if isinstance(detail, dict):
+        delay = detail.get("retryDelay")
+        return float(delay.rstrip("s")) if isinstance(delay, str) else None
+    delay = getattr(detail, "retry_delay", None)
+    if delay is None:
+        return None
+    return delay.seconds + delay.nanos / 1e9
+
+
+def _retry_after(err: BaseException | None) -> float | None:
+    """Seconds the server asked us to wait, if any.
+
+    gRPC errors (the default transport) carry the delay as a RetryInfo entry
+    in ``details``; REST errors may carry a Retry-After header instead.
+    """
+    cause = getattr(err, "__cause__", None) or err
+    try:
+        for detail in getattr(cause, "details", None) or ():
+            delay = _retry_delay(detail)
+            if delay is not None:
+                return min(delay, _MAX_RETRY_AFTER)
+    except (AttributeError, TypeError, ValueError):
+        pass
+    headers = getattr(getattr(cause, "response", None), "headers", None) or {}
+    try:
+        return min(float(headers.get("Retry-After")), _MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return None
+
+
+def _wait(retry_state: RetryCallState) -> float:
+    """Jittered exponential backoff, stretched to honour the server's retry delay on 429s."""
+    delay = _backoff(retry_state)
+    retry_after = _retry_after(retry_state.outcome.exception())
+    return max(delay, retry_after) if retry_after else delay
+
+
+_RETRY_POLICY = dict(
+    wait=_wait,
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception(_is_retryable),
+    reraise=True,
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _configure(api_key: str, transport: str) -> None:
+    """Configure the SDK once per process (again only if the settings change)."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key, transport=transport)
+
+
+@functools.lru_cache(maxsize=8)
+def _model(name: str, system_instruction: str | None) -> genai.GenerativeModel:
+    """Shared GenerativeModel per (model name, system instruction)."""
+    import google.generativeai as genai
+
+    return genai.GenerativeModel(name, system_instruction=system_instruction)
 
 
 class GeminiClient:
     """A client for interacting with the Gemini API using the google-generativeai SDK."""
 
-    def __init__(self, api_key: str | None = None, model: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str | None = None,
+        system_instruction: str | None = None,
+    ) -> None:
         """Initializes the Gemini client.
 
         Args:
@@ -29,66 +146,143 @@ class GeminiClient:
               be read from the GEMINI_API_KEY environment variable.
             model: The Gemini model to use. If not provided, it will default
               to 'gemini-1.5-flash' (widely supported).
+            system_instruction: Optional system instruction applied to every
+              request made through this client.
         """
         self.api_key = api_key or os.environ.get(API_KEY_ENV)
         if not self.api_key:
             raise RuntimeError(f"Environment variable {API_KEY_ENV} is required for Gemini access")
 
         # Configure the API key
-        genai.configure(api_key=self.api_key)
+        _configure(self.api_key, os.getenv(TRANSPORT_ENV, DEFAULT_TRANSPORT))
         
         # Set the model name - use globally supported model as default
         self.model_name = model or "gemini-1.5-flash"
+        self.system_instruction = system_instruction
         
         # Initialize the model
         try:
-            self.model = genai.GenerativeModel(self.model_name)
-            print(f"✅ Gemini client initialized with model: {self.model_name}")
+            self.model = _model(self.model_name, self.system_instruction)
+            logger.info("✅ Gemini client initialized with model: %s", self.model_name)
         except Exception as e:
-            print(f"❌ Failed to initialize Gemini model '{self.model_name}': {e}")
+            logger.warning("❌ Failed to initialize Gemini model '%s': %s", self.model_name, e)
             # Try fallback models in order of preference
             fallback_models = ["gemini-1.5-pro", "gemini-1.0-pro"]
             
             for fallback_model in fallback_models:
                 try:
                     self.model_name = fallback_model
-                    self.model = genai.GenerativeModel(self.model_name)
-                    print(f"✅ Fallback to model: {self.model_name}")
+                    self.model = _model(self.model_name, self.system_instruction)
+                    logger.info("✅ Fallback to model: %s", self.model_name)
                     break
                 except Exception as e2:
-                    print(f"❌ Fallback model '{fallback_model}' also failed: {e2}")
+                    logger.warning("❌ Fallback model '%s' also failed: %s", fallback_model, e2)
                     continue
             else:
                 raise RuntimeError(f"Failed to initialize any Gemini model. Last error: {e}")
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=10), stop=stop_after_attempt(3))
+    @retry(**_RETRY_POLICY)
     def generate_content(self, *, prompt: str, **kwargs: Any) -> str:
         """Generate text content using Gemini model with retries."""
         try:
-            print(f"🤖 Calling Gemini API with model: {self.model_name}")
+            logger.debug("🤖 Calling Gemini API with model: %s", self.model_name)
             response = self.model.generate_content(prompt, **kwargs)
             
             if not response.text:
-                raise RuntimeError("Gemini API returned empty response")
+                raise EmptyResponseError("Gemini API returned empty response")
                 
-            print(f"✅ Gemini API call successful, response length: {len(response.text)} characters")
+            logger.debug("✅ Gemini API call successful, response length: %d characters", len(response.text))
             return response.text
             
         except Exception as err:
-            print(f"❌ Gemini API call failed: {err}")
-            
-            # 如果是地理位置限制错误，提供明确的错误信息
-            if "User location is not supported" in str(err):
-                error_msg = (
-                    f"Gemini API地理位置限制错误: {err}\n\n"
-                    "建议解决方案:\n"
-                    "1. 使用支持地区的VPN服务\n"
-                    "2. 联系Google Cloud支持申请地区访问权限\n"
-                    "3. 考虑部署到支持的Google Cloud地区\n"
-                    "4. 使用其他AI服务提供商的API"
-                )
-                raise RuntimeError(error_msg) from err
-            
-            # 其他错误直接抛出
-            error_msg = f"Gemini API call failed with model '{self.model_name}': {err}"
-            raise RuntimeError(error_msg) from err 
\ No newline at end of file
+            logger.warning("❌ Gemini API call failed: %s", err)
+            raise self._wrap_error(err) from err
+
+    async def agenerate_content(self, *, prompt: str, **kwargs: Any) -> str:
+        """Async version of :meth:`generate_content` with the same retry policy."""
+        async for attempt in AsyncRetrying(**_RETRY_POLICY):
+            with attempt:
+                try:
+                    response = await self.model.generate_content_async(prompt, **kwargs)
+                    if not response.text:
+                        raise EmptyResponseError("Gemini API returned empty response")
+                    return response.text
+                except Exception as err:
+                    logger.warning("❌ Gemini API call failed: %s", err)
+                    raise self._wrap_error(err) from err
+
+    def generate_content_stream(self, *, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """Yield response text chunks as Gemini produces them.
+
+        Callers can start parsing before generation finishes, or stop early
+        once they have what they need. Not retried: a partially consumed stream
+        cannot be replayed transparently.
+        """
+        logger.debug("🤖 Streaming Gemini API response with model: %s", self.model_name)
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True, **kwargs):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as err:
+            logger.warning("❌ Gemini API call failed: %s", err)
+            raise self._wrap_error(err) from err
+
+    async def agenerate_content_stream(self, *, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """Async version of :meth:`generate_content_stream`."""
+        try:
+            response = await self.model.generate_content_async(prompt, stream=True, **kwargs)
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as err:
+            logger.warning("❌ Gemini API call failed: %s", err)
+            raise self._wrap_error(err) from err
+
+    def generate_batch(
+        self, prompts: Sequence[str], concurrency: int = 16, **kwargs: Any
+    ) -> list[str | BaseException]:
+        """Send independent prompts concurrently and return results in order.
+
+        A failed prompt yields its exception in place of the text, so one
+        failure does not discard the other responses. Must not be called from
+        a running event loop; use :meth:`agenerate_content` there instead.
+        """
+        async def run_all() -> list[str | BaseException]:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def run_one(prompt: str) -> str:
+                async with semaphore:
+                    return await self.agenerate_content(prompt=prompt, **kwargs)
+
+            return await asyncio.gather(*(run_one(p) for p in prompts), return_exceptions=True)
+
+        logger.debug("🤖 Calling Gemini API with model: %s (%d prompts)", self.model_name, len(prompts))
+        return asyncio.run(run_all())
+
+    def _wrap_error(self, err: Exception) -> RuntimeError:
+        """Turn an SDK error into the RuntimeError surfaced to the agents."""
+        # 如果是地理位置限制错误，提供明确的错误信息
+        if "User location is not supported" in str(err):
+            error_msg = (
+                f"Gemini API地理位置限制错误: {err}\n\n"
+                "建议解决方案:\n"
+                "1. 使用支持地区的VPN服务\n"
+                "2. 联系Google Cloud支持申请地区访问权限\n"
+                "3. 考虑部署到支持的Google Cloud地区\n"
+                "4. 使用其他AI服务提供商的API"
+            )
+            return RuntimeError(error_msg)
+        
+        # 其他错误直接抛出
+        return RuntimeError(f"Gemini API call failed with model '{self.model_name}': {err}")
+
+
+_default_client: GeminiClient | None = None
+
+
+def generate_content(*, prompt: str, **kwargs: Any) -> str:
+    """Generate content with a process-wide default :class:`GeminiClient`."""
+    global _default_client
+    if _default_client is None:
+        _default_client = GeminiClient()
+    return _default_client.generate_content(prompt=prompt, **kwargs)
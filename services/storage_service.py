@@ -11,14 +11,22 @@ allowing easy mocking and testing.
 from __future__ import annotations
 
 import abc
+import asyncio
+import functools
+import hashlib
+import logging
 import os
+import shutil
+import tempfile
 import typing as _t
 from pathlib import Path
-from typing import Protocol
-from google.cloud import storage
-from google.cloud.exceptions import GoogleCloudError
+from typing import TYPE_CHECKING, Protocol
 from dotenv import load_dotenv
 
+# google.cloud.storage 导入较慢，只在第一次用到 GCS 时加载
+if TYPE_CHECKING:
+    from google.cloud import storage
+
 __all__ = [
     "IStorageService",
     "GCSStorageService",
@@ -29,6 +37,13 @@ __all__ = [
 # 加载环境变量
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# 大文件分块上传参数：8 MiB 分块，超过 32 MiB 的文件并发上传各分块
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+PARALLEL_UPLOAD_THRESHOLD = 32 * 1024 * 1024
+PARALLEL_UPLOAD_WORKERS = 8
+
 class IStorageService(Protocol):
     """Protocol for storage service implementations."""
 
@@ -40,47 +55,139 @@ class IStorageService(Protocol):
         """Save a file and return its URI."""
         ...
 
+    def save_files(self, file_paths: list[Path]) -> list[str]:
+        """Save several files and return their URIs in the same order."""
+        ...
+
     def save_report(self, report_content: str, original_filename: str) -> str:
         """Save a report string to a file and return its URI."""
         ...
 
+    async def save_report_async(self, report_content: str, original_filename: str) -> str:
+        """Save a report without blocking the event loop and return its URI."""
+        ...
+
     def download_file(self, *, source: str, target_path: Path | str) -> None:
         """Download a file from the storage service."""
         ...
 
 
+def _content_name(fileobj, filename: str) -> str:
+    """按内容的 SHA-256 生成存储文件名（保留原扩展名），相同内容得到相同名称"""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return f"{digest.hexdigest()}{Path(filename).suffix.lower()}"
+
+
+def _write_via_temp(target_path: Path, fill: _t.Callable[[str], None]) -> None:
+    """先由 fill 写入目标目录中唯一命名的临时文件，再改名为目标文件，
+    避免中断时留下不完整的同名文件，也避免并发保存相同内容时互相覆盖临时文件"""
+    fd, tmp_path = tempfile.mkstemp(dir=target_path.parent, suffix=".part")
+    os.close(fd)
+    try:
+        fill(tmp_path)
+        os.replace(tmp_path, target_path)
+    except OSError:
+        # 其他会话已保存了相同内容（文件名即内容哈希），视为成功
+        if not target_path.exists():
+            raise
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _copy_stream(fileobj, path: str) -> None:
+    """按 1 MiB 分块把文件对象写入 path"""
+    with open(path, "wb") as f:
+        shutil.copyfileobj(fileobj, f, length=1024 * 1024)
+
+
+@functools.lru_cache(maxsize=None)
+def _storage_client(project_id: str) -> storage.Client:
+    """每个项目在进程内共享一个 storage.Client，复用其 HTTP 连接池"""
+    from google.cloud import storage
+
+    return storage.Client(project=project_id)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_gs_uri(uri: str) -> tuple[str, str]:
+    """把 gs://bucket/blob 拆成 (bucket, blob)，同一 URI 只解析一次"""
+    if not uri.startswith("gs://"):
+        raise ValueError("Expected a gs:// URI")
+    bucket, _, blob_name = uri[len("gs://"):].partition("/")
+    return bucket, blob_name
+
+
+def _file_key(file_path: Path) -> tuple:
+    """标识本地文件的一个版本（路径、大小、修改时间），内容未变时无需重新计算哈希"""
+    stat = file_path.stat()
+    return (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+
 class LocalStorageService:
     """Local file system implementation of :class:`IStorageService`."""
 
     def __init__(self, *, base_path: Path | str | None = None) -> None:
         self._base_path: Path = Path(base_path or "storage")
-        self._base_path.mkdir(parents=True, exist_ok=True)
+        # 已创建过的目录，避免每次保存都重复 mkdir
+        self._ensured_dirs: set[Path] = set()
+        self._ensure(self._base_path)
+        # (source path, size, mtime) -> stored path, so re-saving an unchanged
+        # file skips hashing it again
+        self._saved_files: dict[tuple, str] = {}
+
+    def _ensure(self, directory: Path) -> None:
+        """Create directory once per service instance."""
+        if directory not in self._ensured_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(directory)
 
     def save_uploaded_file(self, uploaded_file, filename: str) -> str:
-        """Save uploaded file to local storage and return file path."""
-        file_path = self._base_path / filename
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        """Save uploaded file to local storage and return file path.
+
+        Files are stored under their content hash, so uploading identical bytes
+        again returns the existing path without rewriting it.
+        """
+        file_path = self._base_path / _content_name(uploaded_file, filename)
+        if file_path.exists():
+            return str(file_path)
+        self._ensure(file_path.parent)
         
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.read())
+        _write_via_temp(file_path, functools.partial(_copy_stream, uploaded_file))
         
         return str(file_path)
 
     def save_file(self, file_path: Path) -> str:
-        """Copy file to storage directory and return the new path."""
-        target_path = self._base_path / file_path.name
-        target_path.parent.mkdir(parents=True, exist_ok=True)
+        """Copy file to storage directory and return the new path.
+
+        Like uploads, files are stored under their content hash and identical
+        content is only copied once.
+        """
+        key = _file_key(file_path)
+        if key in self._saved_files and Path(self._saved_files[key]).exists():
+            return self._saved_files[key]
         
-        # 复制文件到存储目录
-        import shutil
-        shutil.copy2(file_path, target_path)
+        with open(file_path, "rb") as f:
+            target_path = self._base_path / _content_name(f, file_path.name)
+        if not target_path.exists():
+            self._ensure(target_path.parent)
+            _write_via_temp(target_path, functools.partial(shutil.copyfile, file_path))
         
+        self._saved_files[key] = str(target_path)
         return str(target_path)
 
+    def save_files(self, file_paths: list[Path]) -> list[str]:
+        """Copy several files to the storage directory."""
+        return [self.save_file(file_path) for file_path in file_paths]
+
     def save_report(self, report_content: str, original_filename: str) -> str:
         """Save report content to a local file."""
         report_dir = self._base_path / "reports"
-        report_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure(report_dir)
         
         report_filename = f"report_{Path(original_filename).stem}.txt"
         report_path = report_dir / report_filename
@@ -90,64 +197,147 @@ class LocalStorageService:
             
         return str(report_path)
 
+    async def save_report_async(self, report_content: str, original_filename: str) -> str:
+        """Save report content to a local file from a worker thread."""
+        return await asyncio.to_thread(self.save_report, report_content, original_filename)
+
     def download_file(self, *, source: str, target_path: Path | str) -> None:
         """Copy file from storage to target path."""
         source_path = Path(source)
         target = Path(target_path)
-        target.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure(target.parent)
         
-        import shutil
-        shutil.copy2(source_path, target)
+        shutil.copyfile(source_path, target)
 
 
 class GCSStorageService:
     """Google Cloud Storage implementation of :class:`IStorageService`."""
 
+    # 本进程内已确认存在的 bucket，只在首次构造时探测一次
+    _VERIFIED: set[str] = set()
+
     def __init__(self, bucket_name: str = None, project_id: str = None):
         # 使用环境变量或传入的参数
         self.project_id = project_id or os.getenv('GOOGLE_CLOUD_PROJECT', 'auditai-final-try')
         self.bucket_name = bucket_name or os.getenv('STORAGE_BUCKET', 'auditai-claims-bucket1')
+        self._saved_files: dict[tuple, str] = {}
+        self._uri_prefix = f"gs://{self.bucket_name}/"
+        
+        if self.bucket_name in type(self)._VERIFIED:
+            self.client = _storage_client(self.project_id)
+            self._bucket = self.client.bucket(self.bucket_name)
+            return
         
         try:
-            print(f"🔗 尝试连接到Google Cloud Storage")
-            print(f"   项目: {self.project_id}")
-            print(f"   存储桶: {self.bucket_name}")
+            logger.info("🔗 尝试连接到Google Cloud Storage (项目: %s, 存储桶: %s)", self.project_id, self.bucket_name)
             
             # 移除服务账户密钥，使用Application Default Credentials (ADC)
             # 这将使用用户的gcloud凭据，避免JWT签名错误
-            self.client = storage.Client(project=self.project_id)
+            self.client = _storage_client(self.project_id)
             self._bucket = self.client.bucket(self.bucket_name)
             
             # 测试bucket访问权限
             if self._bucket.exists():
-                print(f"✅ 成功连接到Google Cloud Storage bucket: {self.bucket_name}")
+                type(self)._VERIFIED.add(self.bucket_name)
+                logger.info("✅ 成功连接到Google Cloud Storage bucket: %s", self.bucket_name)
             else:
                 raise RuntimeError(f"Bucket {self.bucket_name} does not exist")
                 
         except Exception as e:
-            print(f"⚠️ Google Cloud Storage连接失败: {e}")
+            logger.warning("⚠️ Google Cloud Storage连接失败: %s", e)
             raise e
     
     def save_uploaded_file(self, uploaded_file, filename: str) -> str:
-        """上传文件到GCS并返回GS URI"""
-        # 重置文件指针到开头
-        uploaded_file.seek(0)
-        
-        blob_name = f"uploaded/{filename}"
-        blob = self._bucket.blob(blob_name)
-        blob.upload_from_file(uploaded_file, content_type='application/pdf')
-        return f"gs://{self.bucket_name}/{blob_name}"
+        """上传文件到GCS并返回GS URI（按内容哈希命名，相同内容已存在时跳过上传）"""
+        from google.api_core.exceptions import PreconditionFailed
+
+        blob_name = f"uploaded/{_content_name(uploaded_file, filename)}"
+        blob = self._bucket.blob(blob_name, chunk_size=UPLOAD_CHUNK_SIZE)
+        try:
+            # if_generation_match=0：仅在对象不存在时写入，无需先查询是否存在
+            blob.upload_from_file(
+                uploaded_file, content_type='application/pdf', checksum="crc32c", if_generation_match=0
+            )
+        except PreconditionFailed:
+            pass  # 相同内容已存储
+        return self._uri_prefix + blob_name
 
     # ---------------------------------------------------------------------
     # IStorageService protocol methods
     # ---------------------------------------------------------------------
 
     def save_file(self, file_path: Path) -> str:  # noqa: D401
-        """Upload a file to GCS and return its GS URI."""
-        blob_name = f"files/{file_path.name}"
-        blob = self._bucket.blob(blob_name)
-        blob.upload_from_filename(file_path.as_posix())
-        return f"gs://{self.bucket_name}/{blob_name}"
+        """Upload a file to GCS and return its GS URI (skipped if the content already exists)."""
+        key = _file_key(file_path)
+        if key in self._saved_files:
+            return self._saved_files[key]
+        
+        with open(file_path, "rb") as f:
+            blob_name = f"files/{_content_name(f, file_path.name)}"
+        blob = self._bucket.blob(blob_name, chunk_size=UPLOAD_CHUNK_SIZE)
+        if file_path.stat().st_size > PARALLEL_UPLOAD_THRESHOLD:
+            # XML multipart uploads take no generation precondition, so large
+            # files keep the existence check (cheap next to the upload itself)
+            if not blob.exists():
+                from google.cloud.storage import transfer_manager
+
+                transfer_manager.upload_chunks_concurrently(
+                    file_path.as_posix(),
+                    blob,
+                    chunk_size=UPLOAD_CHUNK_SIZE,
+                    max_workers=PARALLEL_UPLOAD_WORKERS,
+                )
+        else:
+            from google.api_core.exceptions import PreconditionFailed
+
+            try:
+                # Only written if the object does not exist yet; no separate probe
+                blob.upload_from_filename(file_path.as_posix(), checksum="crc32c", if_generation_match=0)
+            except PreconditionFailed:
+                pass  # Identical content is already stored
+        
+        uri = self._uri_prefix + blob_name
+        self._saved_files[key] = uri
+        return uri
+
+    def save_files(self, file_paths: list[Path]) -> list[str]:
+        """Upload several files in parallel and return their GS URIs in order.
+
+        Blobs are named by content hash as in :meth:`save_file`; with
+        ``skip_if_exists`` the uploads carry an ``if_generation_match=0``
+        precondition, so content that already exists is left untouched without
+        probing each blob first. Uploads run in threads: a handful of claim
+        files is not worth starting and pickling into worker processes.
+        """
+        uris: list[str] = []
+        pending: list[tuple[tuple, str, str, storage.Blob]] = []
+        for file_path in file_paths:
+            key = _file_key(file_path)
+            if key in self._saved_files:
+                uris.append(self._saved_files[key])
+                continue
+            with open(file_path, "rb") as f:
+                blob_name = f"files/{_content_name(f, file_path.name)}"
+            uri = self._uri_prefix + blob_name
+            uris.append(uri)
+            blob = self._bucket.blob(blob_name, chunk_size=UPLOAD_CHUNK_SIZE)
+            pending.append((key, uri, file_path.as_posix(), blob))
+
+        if pending:
+            from google.cloud.storage import transfer_manager
+
+            # Existing blobs (412 Precondition Failed) are not raised with skip_if_exists
+            transfer_manager.upload_many(
+                [(source, blob) for _, _, source, blob in pending],
+                skip_if_exists=True,
+                upload_kwargs={"checksum": "crc32c"},
+                max_workers=PARALLEL_UPLOAD_WORKERS,
+                worker_type=transfer_manager.THREAD,
+                raise_exception=True,
+            )
+            for key, uri, _, _ in pending:
+                self._saved_files[key] = uri
+        return uris
 
     def save_report(self, report_content: str, original_filename: str) -> str:
         """Save report content to GCS and return its GS URI."""
@@ -157,7 +347,11 @@ class GCSStorageService:
         blob = self._bucket.blob(blob_name)
         blob.upload_from_string(report_content, content_type="text/plain; charset=utf-8")
         
-        return f"gs://{self.bucket_name}/{blob_name}"
+        return self._uri_prefix + blob_name
+
+    async def save_report_async(self, report_content: str, original_filename: str) -> str:
+        """Upload report content to GCS from a worker thread."""
+        return await asyncio.to_thread(self.save_report, report_content, original_filename)
 
     def download_file(self, *, source: str, target_path: Path | str) -> None:  # noqa: D401
         """Download a file from GCS."""
@@ -167,19 +361,23 @@ class GCSStorageService:
 
     def _extract_blob_name(self, uri: str) -> str:
         """Extract the blob name from a GS URI."""
-        if not uri.startswith("gs://"):
-            raise ValueError("Expected a gs:// URI")
-        parts = uri.replace("gs://", "").split("/", 1)
-        if parts[0] != self.bucket_name or len(parts) != 2:
+        bucket, blob_name = _parse_gs_uri(uri)
+        if bucket != self.bucket_name or not blob_name:
             raise ValueError("URI bucket does not match configured bucket")
-        return parts[1]
+        return blob_name
 
 
+@functools.lru_cache(maxsize=1)
 def get_storage_service() -> IStorageService:
-    """Factory function to get the appropriate storage service."""
+    """Factory function to get the appropriate storage service.
+
+    The service is created once and shared by the whole process; call
+    ``get_storage_service.cache_clear()`` to force a new one (e.g. after
+    changing the storage environment variables).
+    """
     try:
         # 尝试使用Google Cloud Storage
         return GCSStorageService()
     except Exception as e:
-        print(f"🔄 自动切换到本地存储: {e}")
+        logger.info("🔄 自动切换到本地存储: %s", e)
         return LocalStorageService() 
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""Compile utils/locales/*.json translation catalogs to pickle files.
+
+The JSON files stay the source of truth; the compiled ``.pickle`` files load
+several times faster and are picked up by ``utils.i18n`` whenever they are at
+least as new as their JSON source. Run after editing a catalog:
+
+    python tools/compile_catalogs.py
+"""
+
+import json
+import pickle
+from pathlib import Path
+
+LOCALES_DIR = Path(__file__).resolve().parent.parent / "utils" / "locales"
+
+
+def compile_catalogs(locales_dir: Path = LOCALES_DIR) -> list:
+    """Write a .pickle next to every .json catalog and return the written paths."""
+    written = []
+    for source in sorted(locales_dir.glob("*.json")):
+        with open(source, encoding="utf-8") as f:
+            catalog = json.load(f)
+        target = source.with_suffix(".pickle")
+        with open(target, "wb") as f:
+            pickle.dump(catalog, f, protocol=5)
+        written.append(target)
+    return written
+
+
+if __name__ == "__main__":
+    for path in compile_catalogs():
+        print(f"✅ {path.relative_to(LOCALES_DIR.parent.parent)}")
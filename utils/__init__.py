@@ -1,5 +1,5 @@
 """Utilities for the AuditAI project."""
 
-from .pdf_parser import PDFParser
+from .pdf_parser import PDFParser, get_pdf_parser
 
-__all__ = ["PDFParser"] 
\ No newline at end of file
+__all__ = ["PDFParser", "get_pdf_parser"] 
\ No newline at end of file
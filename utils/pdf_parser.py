@@ -1,10 +1,96 @@
 """PDF text extraction utility."""
+import atexit
+import functools
+import hashlib
+import io
+import multiprocessing
 import os
-from pdfminer.high_level import extract_text
-from pdfminer.layout import LAParams
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+from pdfminer.high_level import extract_pages, extract_text_to_fp
+from pdfminer.layout import LAParams, LTTextContainer
+from pdfminer.pdfparser import PDFSyntaxError
+
+# PyMuPDF (C) extracts plain text far faster than pdfminer (pure Python);
+# pdfminer remains the fallback when it is not installed
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+# Number of parsed documents kept in memory, keyed by content hash
+TEXT_CACHE_SIZE = 32
+
+
+# Documents with at least this many pages are split across worker processes;
+# below it, handing pages to the worker pool costs more than PyMuPDF needs for the whole file
+PARALLEL_MIN_PAGES = 32
+
+
+@functools.lru_cache(maxsize=None)
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return a shared worker pool, created on first use and shut down at exit.
+
+    Workers are spawned rather than forked: the caller is often multi-threaded
+    (Streamlit script threads, pipeline workers) with gRPC loaded, and forking
+    such a process can deadlock the child.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    atexit.register(executor.shutdown, cancel_futures=True)
+    return executor
+
+
+def _open_document(*args, **kwargs) -> "fitz.Document":
+    """Open a document with PyMuPDF, reporting unreadable files as PDFSyntaxError
+    so callers handle corrupt PDFs the same way whichever backend is used."""
+    try:
+        return fitz.open(*args, **kwargs)
+    except fitz.FileDataError as e:
+        raise PDFSyntaxError(str(e)) from e
+
+
+def _extract_page_range(args: Tuple[str, int, int]) -> str:
+    """Extract pages [start, stop) in a worker process (fitz documents cannot be pickled)."""
+    pdf_path, start, stop = args
+    with fitz.open(pdf_path) as doc:
+        return "\n".join(doc[i].get_text("text") for i in range(start, stop))
+
+
+def _file_digest(pdf_path: str) -> str:
+    """Return a BLAKE2b digest of the file content (hashing is far cheaper than parsing)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(pdf_path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
 class PDFParser:
-    """A class to handle PDF text extraction."""
+    """A class to handle PDF text extraction.
+
+    Extracted text is cached by file content, so the same PDF (re-uploaded,
+    re-downloaded to a new temp path, or re-run after a Streamlit rerun) is
+    only parsed once per process.
+
+    Instances hold no per-document state and are safe to share between
+    threads; use :func:`get_pdf_parser` for the process-wide instance.
+    """
+
+    # Layout parameters are read-only configuration, shared by every call
+    _laparams = LAParams()
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers: Processes used to extract large PDFs in parallel
+                (defaults to the CPU count; 1 disables the process pool).
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._text_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """
@@ -15,14 +101,117 @@ class PDFParser:
 
         Returns:
             The extracted text as a single string.
-        
+
         Raises:
             FileNotFoundError: If the pdf_path does not exist.
+            PDFSyntaxError: If the file is not a readable PDF.
         """
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"No such file or directory: '{pdf_path}'")
-        
+
+        return self._cached(_file_digest(pdf_path), self._parse, pdf_path)
+
+    def extract_text_from_bytes(self, data: bytes) -> str:
+        """
+        Extracts text from PDF content already held in memory.
+
+        Shares the content-hash cache with :meth:`extract_text_from_pdf`, so
+        parsing an upload's bytes while the file is being stored means the
+        later parse of the stored copy is a cache hit.
+
+        Args:
+            data: The raw bytes of the PDF file.
+
+        Returns:
+            The extracted text as a single string.
+
+        Raises:
+            PDFSyntaxError: If the data is not a readable PDF.
+        """
+        key = hashlib.blake2b(data, digest_size=16).hexdigest()
+        return self._cached(key, self._parse_bytes, data)
+
+    def _cached(self, key: str, parse: Callable[[Any], str], source: Any) -> str:
+        """Return the cached text for ``key``, parsing ``source`` on a miss."""
+        with self._cache_lock:
+            text = self._text_cache.get(key)
+            if text is not None:
+                self._text_cache.move_to_end(key)
+                return text
+
+        text = parse(source)
+        with self._cache_lock:
+            self._text_cache[key] = text
+            while len(self._text_cache) > TEXT_CACHE_SIZE:
+                self._text_cache.popitem(last=False)
+        return text
+
+    def _parse(self, pdf_path: str) -> str:
+        """Extract the whole document with PyMuPDF, or pdfminer if unavailable."""
+        if fitz is not None:
+            with _open_document(pdf_path) as doc:
+                page_count = doc.page_count
+                if self.workers < 2 or page_count < PARALLEL_MIN_PAGES:
+                    return "\n".join(page.get_text("text") for page in doc).strip()
+
+            # One contiguous page range per worker, so each opens the file once
+            step = -(-page_count // self.workers)
+            ranges = [(pdf_path, start, min(start + step, page_count)) for start in range(0, page_count, step)]
+            executor = _process_pool(self.workers)
+            return "\n".join(executor.map(_extract_page_range, ranges)).strip()
+
         # Using LAParams to improve layout analysis can sometimes yield better results
-        laparams = LAParams()
-        text = extract_text(pdf_path, laparams=laparams)
-        return text.strip() 
\ No newline at end of file
+        # Text is written page by page into one buffer instead of being
+        # accumulated as intermediate per-page strings
+        buffer = io.StringIO()
+        with open(pdf_path, "rb") as fp:
+            extract_text_to_fp(fp, buffer, laparams=self._laparams)
+        return buffer.getvalue().strip()
+
+    def _parse_bytes(self, data: bytes) -> str:
+        """Extract an in-memory document serially (worker processes need a file path)."""
+        if fitz is not None:
+            with _open_document(stream=data, filetype="pdf") as doc:
+                return "\n".join(page.get_text("text") for page in doc).strip()
+
+        buffer = io.StringIO()
+        extract_text_to_fp(io.BytesIO(data), buffer, laparams=self._laparams)
+        return buffer.getvalue().strip()
+
+    def iter_pages(self, pdf_path: str) -> Iterator[str]:
+        """
+        Yields the text of a PDF one page at a time.
+
+        Lets callers that chunk or stream the content start before the whole
+        document is parsed, holding only one page's layout in memory.
+
+        Args:
+            pdf_path: The path to the PDF file.
+
+        Yields:
+            The extracted text of each page, in order.
+
+        Raises:
+            FileNotFoundError: If the pdf_path does not exist.
+        """
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"No such file or directory: '{pdf_path}'")
+
+        if fitz is not None:
+            with _open_document(pdf_path) as doc:
+                for page in doc:
+                    yield page.get_text("text")
+            return
+
+        for page_layout in extract_pages(pdf_path, laparams=self._laparams):
+            yield "".join(
+                element.get_text()
+                for element in page_layout
+                if isinstance(element, LTTextContainer)
+            )
+
+
+@functools.lru_cache(maxsize=1)
+def get_pdf_parser() -> PDFParser:
+    """Return the shared PDFParser, so its text cache serves every pipeline."""
+    return PDFParser()